@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark sanitizing BEL Script.
+
+Generates a synthetic BEL Script with the given number of lines, made of repeated statement groups
+with comments, notes, backslash continuations, unbalanced quotes, and trailing comments, then prints
+the lines per second of :func:`bel_resources.read_document.sanitize_file_lines` and
+:func:`bel_resources.read_document.sanitize_file_lines_fast`, after checking they give the same results.
+
+Run with ``python benchmarks/bench_sanitize.py 2000000``.
+"""
+
+import sys
+import time
+from collections import deque
+
+from bel_resources.read_document import sanitize_file_lines, sanitize_file_lines_fast
+
+BLOCK = [
+    '# Statements about protein {i}',
+    '#: note about protein {i}',
+    'SET Citation = {{"PubMed", "Article {i}", "{i}"}}',
+    'SET Evidence = "Evidence for protein {i} \\',
+    'that goes on for \\',
+    'three lines"',
+    'SET Species = 9606',
+    '',
+    'p(HGNC:P{i}) -> p(HGNC:Q{i})',
+    'p(HGNC:P{i}) -| act(p(HGNC:R{i})) // with a comment',
+    'SET Evidence = "Evidence for protein {i} that forgot',
+    'its line breaks"',
+    'complex(p(HGNC:P{i}), p(HGNC:Q{i})) => bp(GO:"cell death")',
+    '',
+    'UNSET Evidence',
+]
+
+
+def make_lines(count: int):
+    """Make a synthetic BEL Script with at least the given number of lines."""
+    lines = []
+    i = 0
+    while len(lines) < count:
+        lines.extend(line.format(i=i) for line in BLOCK)
+        i += 1
+    return lines
+
+
+def _time(function, lines) -> float:
+    start = time.perf_counter()
+    deque(function(lines), maxlen=0)
+    return time.perf_counter() - start
+
+
+def main(counts):
+    """Print the lines per second of each implementation for each number of lines."""
+    print('{:>10}  {:>20}  {:>25}'.format('lines', 'sanitize_file_lines', 'sanitize_file_lines_fast'))
+    for count in counts:
+        lines = make_lines(count)
+        if list(sanitize_file_lines(lines[:10000])) != list(sanitize_file_lines_fast(lines[:10000])):
+            raise RuntimeError('the implementations give different results')
+
+        reference = _time(sanitize_file_lines, lines)
+        fast = _time(sanitize_file_lines_fast, lines)
+        print('{:>10}  {:>20,.0f}  {:>25,.0f}'.format(len(lines), len(lines) / reference, len(lines) / fast))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [2000000])
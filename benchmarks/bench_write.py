@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark writing BEL namespace files.
+
+Compares writing one line per :func:`print` call, as the writers used to, with the batched
+:func:`bel_resources.write_utils.write_lines`, then times :func:`bel_resources.write_namespace`
+end-to-end with batches of one line and with the default batch size.
+
+Run with ``python benchmarks/bench_write.py 1000000 10000000``.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bel_resources import write_namespace
+from bel_resources.write_utils import iter_body, write_lines
+
+
+def _print_lines(lines, file):
+    for line in lines:
+        print(line, file=file)
+
+
+def _time(path, function, *args, **kwargs) -> float:
+    with open(path, 'w') as file:
+        start = time.perf_counter()
+        function(*args, file=file, **kwargs)
+        return time.perf_counter() - start
+
+
+def main(counts):
+    """Print the lines per second of each method for each number of values."""
+    fd, path = tempfile.mkstemp(suffix='.belns')
+    os.close(fd)
+
+    print('{:>10}  {:>14}  {:>14}  {:>14}  {:>14}'.format(
+        'values', 'print', 'write_lines', 'namespace (1)', 'namespace',
+    ))
+    for count in counts:
+        values = {
+            'NAME{:09d}'.format(i): 'GRP'
+            for i in range(count)
+        }
+        lines = list(iter_body(values))
+
+        print_seconds = _time(path, _print_lines, lines)
+        batch_seconds = _time(path, write_lines, lines)
+        del lines
+
+        unbuffered_seconds = _time(path, write_namespace, values, 'Bench', 'BENCH', buffer_size=1)
+        buffered_seconds = _time(path, write_namespace, values, 'Bench', 'BENCH')
+        del values
+
+        print('{:>10}  {:>14,.0f}  {:>14,.0f}  {:>14,.0f}  {:>14,.0f}'.format(
+            count,
+            count / print_seconds,
+            count / batch_seconds,
+            count / unbuffered_seconds,
+            count / buffered_seconds,
+        ))
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000000])
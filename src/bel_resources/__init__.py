@@ -2,9 +2,22 @@
 
 """Utilities for downloading, reading, and writing BEL script, namespace files, and annotation files."""
 
-from .exc import EmptyResourceError, InvalidResourceError, MissingResourceError, ResourceError  # noqa: F401
-from .read_document import split_file_to_annotations_and_definitions  # noqa: F401
-from .read_utils import get_bel_resource, get_lines, parse_bel_resource  # noqa: F401
+from .compiled import CompiledResource, compile_bel_resource, compile_values  # noqa: F401
+from .diff import iter_bel_resources_diff, iter_values_diff  # noqa: F401
+from .equivalence import EquivalenceIndex  # noqa: F401
+from .exc import (  # noqa: F401
+    EmptyResourceError, InvalidResourceError, MissingResourceError, ResourceError, UnfinishedLineError,
+)
+from .index import FuzzyIndex, NamespaceIndex, PrefixIndex  # noqa: F401
+from .mapped_document import MappedBELScript  # noqa: F401
+from .merge import iter_merged_values, merge_namespaces  # noqa: F401
+from .prefetch import ResourcePrefetcher, get_definition_urls  # noqa: F401
+from .read_document import (  # noqa: F401
+    IncrementalSplitter, split_file_lazily, split_file_to_annotations_and_definitions,
+)
+from .read_utils import (  # noqa: F401
+    get_bel_resource, get_bel_resources, get_lines, iter_bel_resource, iter_lines, parse_bel_resource,
+)
 from .write_annotation import write_annotation  # noqa: F401
 from .write_document import make_knowledge_header  # noqa: F401
 from .write_namespace import write_namespace  # noqa: F401
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for converting many OBO files to BEL resources in parallel.
+
+A batch is described by a manifest, which is a JSON list of jobs like:
+
+.. code-block:: json
+
+    [
+        {
+            "source": "http://purl.obolibrary.org/obo/doid.obo",
+            "outputs": {"names": "doid-names.belns", "identifiers": "doid.belns", "annotation": "doid.belanno"},
+            "options": {"encoding": "O", "memory_limit": 4000}
+        }
+    ]
+
+Each job is given to :func:`bel_resources.obo.convert_obo_to_bel_resources` in its own process, with a
+bounded number of them running at once, so a large ontology only holds up the process it's converted in and
+a process that's killed, for example by the operating system when it runs out of memory, only fails its own
+job. The processes are started with the ``forkserver`` method, or ``spawn`` where it's missing, so they never
+inherit the locks of other threads. Each output is written to a temporary file next to it, which only
+replaces it if the job succeeds. Memory limits are in megabytes.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing.connection import wait
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+from .obo import convert_obo_to_bel_resources
+
+__all__ = [
+    'ConversionResult',
+    'convert_obo_batch',
+    'read_manifest',
+]
+
+log = logging.getLogger(__name__)
+
+#: The keys of the outputs of a job and the arguments of :func:`convert_obo_to_bel_resources` they are given as
+OUTPUT_ARGUMENTS = {
+    'names': 'names_path',
+    'identifiers': 'identifiers_path',
+    'annotation': 'annotation_path',
+}
+
+#: The options of a job
+OPTIONS = {'encoding', 'memory_limit'}
+
+#: The result of converting one job. The error is none if it succeeded.
+ConversionResult = NamedTuple('ConversionResult', [
+    ('source', str),
+    ('outputs', Dict[str, str]),
+    ('seconds', float),
+    ('error', Optional[str]),
+])
+
+
+def read_manifest(path: str) -> List[Dict]:
+    """Read and check a manifest of conversion jobs.
+
+    :param path: The path to a JSON file with a list of jobs
+    :raises: ValueError if a job is malformed
+    """
+    with open(path) as file:
+        jobs = json.load(file)
+
+    if not isinstance(jobs, list):
+        raise ValueError('manifest should be a list of jobs: {}'.format(path))
+
+    for job in jobs:
+        _check_job(job)
+
+    return jobs
+
+
+def _check_job(job: Mapping) -> None:
+    if not isinstance(job, Mapping) or not isinstance(job.get('source'), str):
+        raise ValueError('job is missing a source: {}'.format(job))
+
+    outputs = job.get('outputs')
+    if not outputs or not isinstance(outputs, Mapping) or not set(outputs) <= set(OUTPUT_ARGUMENTS):
+        raise ValueError('job outputs should be some of {}: {}'.format(sorted(OUTPUT_ARGUMENTS), job))
+
+    if not set(job.get('options', {})) <= OPTIONS:
+        raise ValueError('job options should be some of {}: {}'.format(sorted(OPTIONS), job))
+
+
+def convert_obo_batch(jobs: Iterable[Mapping],
+                      max_workers: Optional[int] = None,
+                      memory_limit: Optional[int] = None,
+                      ) -> Iterator[ConversionResult]:
+    """Convert OBO files in parallel processes, yielding the result of each job as it completes.
+
+    A job that fails, including by going over its memory limit or by its process being killed, gives a
+    result with its error and doesn't stop the others. The outputs of a failed job are left as they were.
+
+    :param jobs: An iterable of jobs, like the ones from :func:`read_manifest`
+    :param max_workers: The number of jobs converted at once. Defaults to the number of processors.
+    :param memory_limit: The default maximum size in megabytes of the address space of the process converting
+     a job, which can be set for each job with its ``memory_limit`` option. Only used on platforms with
+     :mod:`resource`.
+    :raises: ValueError if a job is malformed
+    """
+    jobs = list(jobs)
+    for job in jobs:
+        _check_job(job)
+
+    for result in _iter_results(jobs, max_workers or os.cpu_count() or 1, memory_limit):
+        if result.error is None:
+            log.info('converted %s in %.2f seconds', result.source, result.seconds)
+        else:
+            log.warning('failed to convert %s after %.2f seconds: %s', result.source, result.seconds, result.error)
+        yield result
+
+
+def _iter_results(jobs: Iterable[Mapping], max_workers: int, memory_limit: Optional[int]) -> Iterator[ConversionResult]:
+    """Convert jobs with at most the given number of processes at once, yielding their results as they complete."""
+    context = _get_context()
+    pending = deque(jobs)
+    running = {}  # type: Dict[int, _Conversion]
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                conversion = _Conversion(pending.popleft(), memory_limit, context)
+                if conversion.error is None:
+                    running[conversion.process.sentinel] = conversion
+                else:
+                    yield conversion.finish()
+
+            if running:
+                yield from _iter_finished(running)
+    finally:
+        # the results are no longer wanted, so don't leave the processes running
+        for conversion in running.values():
+            conversion.cancel()
+
+
+def _iter_finished(running: Dict[int, '_Conversion']) -> Iterator[ConversionResult]:
+    """Wait for some of the running conversions to stop, removing them and yielding their results."""
+    ready = set(wait(list(running)))
+    for sentinel in [sentinel for sentinel in running if sentinel in ready]:
+        yield running.pop(sentinel).finish()
+
+
+def _get_context():
+    """Get a context that starts processes without forking the current one, which might have other threads."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+class _Conversion:
+    """A job being converted in its own process to temporary files next to its outputs."""
+
+    def __init__(self, job: Mapping, memory_limit: Optional[int], context) -> None:
+        """Start converting a job. If it can't be started, the error is set."""
+        self.job = job
+        self.start = time.perf_counter()
+        self.temporary_paths = {}  # type: Dict[str, str]
+        self.error = None  # type: Optional[str]
+
+        # the temporary paths are filled in before the process is started, which is when its arguments are sent
+        self._receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_convert_job_in_process,
+            args=(sender, job, self.temporary_paths, memory_limit),
+        )
+        try:
+            for key, path in job['outputs'].items():
+                self.temporary_paths[key] = _make_temporary_path(path)
+            self.process.start()
+        except Exception as e:
+            self.error = _format_error(e)
+            self._receiver.close()
+        finally:
+            sender.close()
+
+    def finish(self) -> ConversionResult:
+        """Get the result once the process has stopped, moving the outputs in place if the job succeeded."""
+        outputs = self.job['outputs']
+        if self.error is None:
+            self.error = self._receive_error()
+
+        try:
+            if self.error is None:
+                for key, path in outputs.items():
+                    os.replace(self.temporary_paths[key], path)
+        except OSError as e:
+            self.error = _format_error(e)
+        finally:
+            self._remove_temporary_files()
+
+        return ConversionResult(self.job['source'], dict(outputs), time.perf_counter() - self.start, self.error)
+
+    def _receive_error(self) -> Optional[str]:
+        # receive before joining, so a long error can't fill the pipe and block the process from stopping
+        try:
+            return self._receiver.recv()
+        except EOFError:
+            self.process.join()
+            return 'the process converting the job stopped unexpectedly with exit code {}'.format(
+                self.process.exitcode,
+            )
+        finally:
+            self.process.join()
+            self._receiver.close()
+
+    def cancel(self) -> None:
+        """Stop the process and remove the temporary files."""
+        self.process.terminate()
+        self.process.join()
+        self._receiver.close()
+        self._remove_temporary_files()
+
+    def _remove_temporary_files(self) -> None:
+        for path in self.temporary_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _make_temporary_path(path: str) -> str:
+    """Make an empty temporary file next to the given path that ends the same way, so it's compressed the same way."""
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='-' + name)
+    os.close(fd)
+    return temporary_path
+
+
+def _convert_job_in_process(sender, job: Mapping, paths: Mapping[str, str], memory_limit: Optional[int]) -> None:
+    """Convert a job in the process started for it, sending back its error, which is none if it succeeded."""
+    sender.send(_convert_job(job, paths, memory_limit))
+    sender.close()
+
+
+def _convert_job(job: Mapping, paths: Mapping[str, str], memory_limit: Optional[int] = None) -> Optional[str]:
+    """Convert a job to the given paths in the current process, returning its error if it failed."""
+    options = dict(job.get('options', {}))
+    memory_limit = options.pop('memory_limit', memory_limit)
+    options.update(
+        (OUTPUT_ARGUMENTS[key], path)
+        for key, path in paths.items()
+    )
+
+    try:
+        with _limit_memory(memory_limit):
+            convert_obo_to_bel_resources(job['source'], **options)
+    except Exception as e:
+        return _format_error(e)
+
+    return None
+
+
+def _format_error(e: Exception) -> str:
+    return '{}: {}'.format(type(e).__name__, e)
+
+
+@contextmanager
+def _limit_memory(limit: Optional[int]):
+    """Lower the soft limit of the address space of the current process, in megabytes, while converting a job."""
+    if limit is None:
+        yield
+        return
+
+    try:
+        import resource
+    except ImportError:
+        log.warning('memory limits are not supported on this platform')
+        yield
+        return
+
+    previous = resource.getrlimit(resource.RLIMIT_AS)
+    resource.setrlimit(resource.RLIMIT_AS, (limit * 1024 * 1024, previous[1]))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, previous)
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+
+"""Caches for parsed BEL namespace and annotation files.
+
+:class:`LRUResourceCache` memoizes parsed resources in memory for long-lived processes.
+
+:class:`ResourceCache` persists them to disk. Its entries are keyed by the SHA-256 hash of their location.
+Each entry is a pickle of the parsed resource, so it loads much faster than reparsing, alongside a small
+JSON file with the HTTP validators (``ETag`` and ``Last-Modified``) or, for local files, the modification
+time and size. Remote resources are revalidated with a conditional request on every access, which costs a
+round-trip but no download when the server answers ``304 Not Modified``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+import requests
+import requests.exceptions
+
+from .exc import MissingResourceError
+from .read_utils import get_bel_resource, iter_lines, iter_response_lines, load_bel_resource
+from .utils import download, is_url
+
+__all__ = [
+    'DEFAULT_CACHE_DIRECTORY',
+    'ResourceCache',
+    'LRUResourceCache',
+]
+
+log = logging.getLogger(__name__)
+
+#: The directory used by :class:`ResourceCache` when none is given
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.bel_resources', 'cache')
+
+_DATA_EXTENSION = '.pickle'
+_META_EXTENSION = '.json'
+
+
+def is_cacheable(resource: Mapping) -> bool:
+    """Check if a parsed resource allows itself to be cached with its ``CacheableFlag``."""
+    return resource.get('Processing', {}).get('CacheableFlag', 'yes').strip().lower() != 'no'
+
+
+class ResourceCache:
+    """A persistent cache of parsed BEL resources."""
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_size: Optional[int] = None,
+                 max_age: Optional[float] = None,
+                 session: Optional[requests.Session] = None,
+                 ) -> None:
+        """Initialize the cache.
+
+        :param directory: The directory in which entries are stored. Defaults to :data:`DEFAULT_CACHE_DIRECTORY`.
+        :param max_size: The maximum total size in bytes of the stored entries. Least recently used entries are
+         evicted first.
+        :param max_age: The maximum age in seconds of an entry since it was downloaded or last revalidated.
+         Older entries are downloaded again.
+        :param session: The session to download with. Defaults to the one from :func:`bel_resources.utils.get_session`.
+        """
+        self.directory = os.path.expanduser(directory or DEFAULT_CACHE_DIRECTORY)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.session = session
+
+    def get_bel_resource(self, location: str, session: Optional[requests.Session] = None) -> Dict:
+        """Get a resource from the cache if it is still valid, otherwise download, parse, and store it.
+
+        :param location: The URL or file path to a BELNS, BELANNO, or BELEQ file to download and parse
+        :param session: The session to download with. Defaults to the cache's session.
+        :return: A config-style dictionary representing the BEL config file
+        :raises: ResourceError
+        """
+        key = self._get_key(location)
+        meta = self._read_meta(key)
+        if meta is not None and self._is_expired(meta):
+            log.debug('resource expired: %s', location)
+            meta = None
+
+        if is_url(location):
+            result, validators, lines = self._get_url(location, key, meta, session or self.session)
+        else:
+            result, validators, lines = self._get_path(location, key, meta)
+
+        if result is not None:
+            os.utime(self._get_path_for(key, _DATA_EXTENSION))
+            return result
+
+        log.debug('caching resource: %s', location)
+        result = load_bel_resource(location, lines)
+
+        if is_cacheable(result):
+            self._write(key, location, result, validators)
+            self.evict()
+        else:
+            self.invalidate(location)
+
+        return result
+
+    def _get_url(self, location: str, key: str, meta: Optional[Dict], session: Optional[requests.Session]):
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            res = download(location, headers=headers, session=session, stream=True)
+        except requests.exceptions.HTTPError as e:
+            raise MissingResourceError(location) from e
+
+        if res.status_code == 304:
+            log.debug('resource not modified: %s', location)
+            res.close()
+            result = self._read_data(key)
+            if result is not None and meta is not None:
+                self._write_meta(key, meta)
+                return result, None, None
+            # the data went missing since the meta file was read, so download everything again
+            self.invalidate(location)
+            res = download(location, session=session, stream=True)
+
+        validators = {
+            'etag': res.headers.get('ETag'),
+            'last_modified': res.headers.get('Last-Modified'),
+        }
+        return None, validators, iter_response_lines(res)
+
+    def _get_path(self, location: str, key: str, meta: Optional[Dict]):
+        stat = os.stat(os.path.expanduser(location))
+        validators = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+        }
+
+        if meta is not None and all(meta.get(k) == v for k, v in validators.items()):
+            result = self._read_data(key)
+            if result is not None:
+                return result, None, None
+
+        return None, validators, iter_lines(location)
+
+    def invalidate(self, location: str) -> None:
+        """Remove the entry for the given location, if it exists."""
+        self._remove(self._get_key(location))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for key in self._iter_keys():
+            self._remove(key)
+
+    def evict(self) -> None:
+        """Remove the entries that are too old, then the least recently used ones until the cache is small enough."""
+        if self.max_age is None and self.max_size is None:
+            return
+
+        entries = sorted(self._iter_fresh_entries())
+        if self.max_size is None:
+            return
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total_size <= self.max_size:
+                break
+            self._remove(key)
+            total_size -= size
+
+    def _iter_fresh_entries(self) -> Iterable[Tuple[float, int, str]]:
+        """Remove incomplete and expired entries, then iterate over the access time, size, and key of the rest."""
+        for key in list(self._iter_keys()):
+            meta = self._read_meta(key)
+            try:
+                stat = os.stat(self._get_path_for(key, _DATA_EXTENSION))
+            except FileNotFoundError:
+                self._remove(key)
+                continue
+
+            if meta is None or self._is_expired(meta):
+                self._remove(key)
+                continue
+
+            yield stat.st_mtime, stat.st_size, key
+
+    def _is_expired(self, meta: Mapping) -> bool:
+        return self.max_age is not None and self.max_age < time.time() - meta.get('fetched', 0)
+
+    @staticmethod
+    def _get_key(location: str) -> str:
+        return hashlib.sha256(location.encode('utf-8')).hexdigest()
+
+    def _get_path_for(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, key + extension)
+
+    def _iter_keys(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(_META_EXTENSION):
+                yield name[:-len(_META_EXTENSION)]
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._get_path_for(key, _META_EXTENSION)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _read_data(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._get_path_for(key, _DATA_EXTENSION), 'rb') as file:
+                return pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _write(self, key: str, location: str, result: Dict, validators: Mapping) -> None:
+        meta = dict(validators)
+        meta['location'] = location
+
+        with self._open_temporary(key, _DATA_EXTENSION, 'wb') as file:
+            pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_meta(key, meta)
+
+    def _write_meta(self, key: str, meta: Dict) -> None:
+        """Write the meta file of an entry, marking it as fetched now."""
+        meta = dict(meta, fetched=time.time())
+        with self._open_temporary(key, _META_EXTENSION, 'w') as file:
+            json.dump(meta, file)
+
+    @contextmanager
+    def _open_temporary(self, key: str, extension: str, mode: str):
+        """Open a new temporary file, then move it in place of the file of an entry once it's written.
+
+        Each writer gets its own temporary file, so several processes can fill the same entry at once.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=key, suffix=extension + '.tmp')
+        try:
+            with open(fd, mode) as file:
+                yield file
+            os.replace(temporary_path, self._get_path_for(key, extension))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def _remove(self, key: str) -> None:
+        for extension in (_META_EXTENSION, _DATA_EXTENSION):
+            try:
+                os.remove(self._get_path_for(key, extension))
+            except FileNotFoundError:
+                pass
+
+
+class LRUResourceCache:
+    """A bounded, thread-safe, in-memory cache of parsed BEL resources with least recently used eviction.
+
+    Resources are returned as read-only views that are shared between all callers, so a hit
+    does not copy anything.
+    """
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 max_values: Optional[int] = None,
+                 loader: Optional[Callable[..., Dict]] = None,
+                 ) -> None:
+        """Initialize the cache.
+
+        :param max_entries: The maximum number of resources to keep
+        :param max_values: The maximum total number of values over all resources to keep, which is a good
+         proxy for their memory usage
+        :param loader: The function used to get a resource on a miss. Defaults to
+         :func:`bel_resources.get_bel_resource`. Use :meth:`ResourceCache.get_bel_resource` to stack both caches.
+         It's given a ``session`` keyword argument when one is passed to :meth:`get_bel_resource`.
+        """
+        self.max_entries = max_entries
+        self.max_values = max_values
+        self.loader = loader if loader is not None else get_bel_resource
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # type: OrderedDict[str, Mapping]
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._entries)
+
+    def __contains__(self, location: str) -> bool:  # noqa: D105
+        return location in self._entries
+
+    def get_bel_resource(self, location: str, session: Optional[requests.Session] = None) -> Mapping:
+        """Get a read-only view of a resource, loading it on a miss.
+
+        :param location: The URL or file path to a BELNS, BELANNO, or BELEQ file to download and parse
+        :param session: If given, the session to download with on a miss, which is passed to the loader
+        :return: A read-only config-style mapping representing the BEL config file
+        :raises: ResourceError
+        """
+        with self._lock:
+            result = self._entries.get(location)
+            if result is not None:
+                self._entries.move_to_end(location)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        # load outside the lock so other resources can be served in the meantime
+        if session is None:
+            result = self.loader(location)
+        else:
+            result = self.loader(location, session=session)
+        result = _freeze_resource(result)
+
+        with self._lock:
+            if location in self._entries:
+                return self._entries[location]
+            self._entries[location] = result
+            self._size += _get_size(result)
+            self._evict()
+
+        return result
+
+    def invalidate(self, location: Optional[str] = None) -> None:
+        """Remove the given location, or all locations if none is given."""
+        with self._lock:
+            if location is None:
+                self._entries.clear()
+                self._size = 0
+            elif location in self._entries:
+                self._size -= _get_size(self._entries.pop(location))
+
+    def _too_many_entries(self) -> bool:
+        return self.max_entries is not None and self.max_entries < len(self._entries)
+
+    def _too_many_values(self) -> bool:
+        return self.max_values is not None and self.max_values < self._size
+
+    def _evict(self) -> None:
+        while self._entries and (self._too_many_entries() or self._too_many_values()):
+            location, result = self._entries.popitem(last=False)
+            log.debug('evicting resource: %s', location)
+            self._size -= _get_size(result)
+
+
+def _freeze_resource(resource: Mapping) -> Mapping:
+    return MappingProxyType({
+        key: MappingProxyType(value) if isinstance(value, dict) else value
+        for key, value in resource.items()
+    })
+
+
+def _get_size(resource: Mapping) -> int:
+    return len(resource['Values'])
@@ -13,13 +13,17 @@ problems--the code will get executed twice:
 Also see (1) from http://click.pocoo.org/5/setuptools/#setuptools-integration
 """
 
+import json
 import sys
+from collections import Counter
 from getpass import getuser
 
 import click
 
-from bel_resources import parse_bel_resource, write_annotation, write_namespace
+from bel_resources import compile_bel_resource, parse_bel_resource, write_annotation, write_namespace
+from bel_resources.batch import convert_obo_batch, read_manifest
 from bel_resources.constants import NAMESPACE_DOMAIN_OTHER
+from bel_resources.diff import iter_bel_resources_diff
 
 
 @click.group()
@@ -76,6 +80,34 @@ def convert_to_annotation(file, output):
     )
 
 
+@namespace.command(name='compile')
+@click.argument('location')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), required=True,
+              help="Path to output compiled BEL Namespace file")
+def compile_namespace(location, output):
+    """Compile a namespace file to the memory-mappable binary format."""
+    compile_bel_resource(location, output)
+
+
+@namespace.command(name='diff')
+@click.argument('old')
+@click.argument('new')
+@click.option('-o', '--output', type=click.File('w'), default='-', help="Path to output the changes as JSON lines")
+@click.option('--max-in-memory', type=int,
+              help="Sort the values on disk first, keeping at most this many in memory. Needed for unsorted files.")
+def diff_namespace(old, new, output, max_in_memory):
+    """Output the names that were added, removed, or changed between two versions of a namespace file."""
+    counter = Counter()
+    for change in iter_bel_resources_diff(old, new, max_in_memory=max_in_memory):
+        counter[change.change] += 1
+        print(json.dumps(change._asdict()), file=output)
+
+    click.echo(', '.join(
+        '{} {}'.format(counter[change], change)
+        for change in ('added', 'removed', 'changed')
+    ), err=True)
+
+
 @main.group()
 def annotation():
     """Annotation file utilities."""
@@ -101,3 +133,29 @@ def convert_to_namespace(file, output, keyword, author):
         citation_name=resource['Citation']['NameString'],
         file=output,
     )
+
+
+@main.group()
+def obo():
+    """OBO conversion utilities."""
+
+
+@obo.command(name='batch')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', type=click.File('w'), default='-', help="Path to output the results as JSON lines")
+@click.option('--workers', type=int, help="Number of processes. Defaults to the number of processors.")
+@click.option('--memory-limit', type=int, help="Default maximum address space of each job, in megabytes")
+def batch_obo(manifest, output, workers, memory_limit):
+    """Convert the OBO files in a JSON manifest to BEL resources in parallel."""
+    failures = 0
+    for result in convert_obo_batch(
+        read_manifest(manifest),
+        max_workers=workers,
+        memory_limit=memory_limit,
+    ):
+        failures += result.error is not None
+        print(json.dumps(result._asdict()), file=output)
+
+    if failures:
+        click.echo('{} jobs failed'.format(failures), err=True)
+        sys.exit(1)
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+"""A compiled, memory-mapped binary format for BEL namespace and annotation files.
+
+The values of a resource are sorted by their UTF-8 encoded names, which are front-coded in blocks
+so each name only stores the suffix it doesn't share with the previous one. The first name of each
+block is stored in full and its position is kept in an offset table, so a lookup is a binary search
+over the blocks followed by a short linear scan inside one block. Encodings are deduplicated into a
+small table and each value only stores its index in a packed array.
+
+The file is opened with :mod:`mmap`, so nothing is deserialized up front and several processes
+looking up values in the same file share a single copy of it in the page cache.
+
+The layout of a file is:
+
+1. a fixed size header with the magic bytes, the format version, the block size, the number of values,
+   the length of the JSON metadata, and the length of the front-coded names
+2. the JSON metadata, containing the header sections of the original resource and the encoding table
+3. the block offset table, as little-endian unsigned 64-bit integers relative to the start of the names
+4. the encoding indexes, as little-endian unsigned 16-bit or 32-bit integers
+5. the front-coded names
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import ItemsView, Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .read_utils import iter_bel_resource, iter_lines
+
+__all__ = [
+    'CompiledResource',
+    'compile_bel_resource',
+    'compile_values',
+]
+
+_MAGIC = b'BELC'
+_VERSION = 2
+_HEADER = struct.Struct('<4sHHQQQ')
+_MAX_BLOCK_SIZE = 0xFFFF
+_ALIGNMENT = 8
+
+#: The default number of names in each front-coded block
+DEFAULT_BLOCK_SIZE = 16
+
+
+def compile_bel_resource(location: str, path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+    """Compile a BELNS, BELANNO, or BELEQ file to the binary format.
+
+    :param location: The URL or file path to a BEL resource
+    :param path: The path of the compiled file to write
+    :param block_size: The number of names in each front-coded block, from 1 to 65535
+    :raises: ValueError if the resource is malformed or the block size is out of range
+    :raises: requests.exceptions.HTTPError
+    """
+    header, values = iter_bel_resource(iter_lines(location))
+    compile_values(values, path, header=header, block_size=block_size)
+
+
+def compile_values(values: Union[Iterable[Tuple[str, Optional[str]]], Mapping],
+                   path: str,
+                   header: Optional[Dict[str, Dict[str, str]]] = None,
+                   block_size: int = DEFAULT_BLOCK_SIZE,
+                   ) -> None:
+    """Compile a mapping of names to their encodings to the binary format.
+
+    :param values: A dictionary of names to their encodings or iterable of pairs of names and their encodings,
+     like the ``Values`` entry from :func:`bel_resources.parse_bel_resource`
+    :param path: The path of the compiled file to write
+    :param header: The header sections of the resource, like the ones from :func:`bel_resources.iter_bel_resource`
+    :param block_size: The number of names in each front-coded block, from 1 to 65535
+    :raises: ValueError if the block size is out of range
+    """
+    if not 1 <= block_size <= _MAX_BLOCK_SIZE:
+        raise ValueError('block size must be from 1 to {}: {}'.format(_MAX_BLOCK_SIZE, block_size))
+
+    if not isinstance(values, Mapping):
+        values = dict(values)
+
+    items = sorted(
+        (name.encode('utf-8'), encoding)
+        for name, encoding in values.items()
+    )
+
+    encodings = {}  # type: Dict[Optional[str], int]
+    encoding_indexes = []
+    for _, encoding in items:
+        encoding_indexes.append(encodings.setdefault(encoding, len(encodings)))
+
+    encoding_typecode = 'H' if len(encodings) <= 0xFFFF else 'I'
+    names, offsets = _front_code(items, block_size)
+
+    meta = json.dumps({
+        'header': header or {},
+        'encodings': sorted(encodings, key=encodings.__getitem__),
+        'encoding_typecode': encoding_typecode,
+    }).encode('utf-8')
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, block_size, len(items), len(meta), len(names)))
+        file.write(meta)
+        _pad(file)
+        _write_array(file, offsets)
+        _write_array(file, array(encoding_typecode, encoding_indexes))
+        _pad(file)
+        file.write(names)
+
+
+def _front_code(items, block_size: int) -> Tuple[bytearray, array]:
+    names = bytearray()
+    offsets = array('Q')
+    previous = b''
+
+    for index, (name, _) in enumerate(items):
+        if 0 == index % block_size:
+            offsets.append(len(names))
+            shared = 0
+        else:
+            shared = _get_shared_prefix_length(previous, name)
+            names += _encode_varint(shared)
+
+        names += _encode_varint(len(name) - shared)
+        names += name[shared:]
+        previous = name
+
+    return names, offsets
+
+
+def _get_shared_prefix_length(a: bytes, b: bytes) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _encode_varint(value: int) -> bytes:
+    result = bytearray()
+    while 0x80 <= value:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _decode_varint(buffer, position: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _write_array(file, values: array) -> None:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(file)
+
+
+def _read_array(buffer: memoryview, typecode: str) -> Union[memoryview, array]:
+    """Get a view of a little-endian array, or a copy of it on big-endian platforms."""
+    if sys.byteorder == 'little':
+        return buffer.cast(typecode)  # type: ignore
+    values = array(typecode, buffer.tobytes())
+    values.byteswap()
+    return values
+
+
+def _pad(file) -> None:
+    remainder = file.tell() % _ALIGNMENT
+    if remainder:
+        file.write(b'\x00' * (_ALIGNMENT - remainder))
+
+
+def _align(position: int) -> int:
+    return position + (-position % _ALIGNMENT)
+
+
+class CompiledResource(Mapping):
+    """A read-only mapping of names to their encodings over a memory-mapped compiled resource.
+
+    Lookups are exact, so they don't take the ``CaseSensitiveFlag`` into account.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open a compiled resource.
+
+        :param path: The path of a file written by :func:`compile_values` or :func:`compile_bel_resource`
+        :raises: ValueError if the file is not a compiled resource
+        """
+        self.path = path
+
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_layout()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_layout(self) -> None:
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError('not a compiled BEL resource: {}'.format(self.path))
+
+        magic, version, self._block_size, self._count, meta_length, names_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('not a compiled BEL resource: {}'.format(self.path))
+
+        position = _HEADER.size
+        meta = json.loads(self._mmap[position:position + meta_length].decode('utf-8'))
+        position = _align(position + meta_length)
+
+        #: The header sections of the original resource
+        self.header = meta['header']  # type: Dict[str, Dict[str, str]]
+        self._encodings = meta['encodings']
+
+        typecode = meta['encoding_typecode']
+        width = struct.calcsize(typecode)
+        block_count = -(-self._count // self._block_size)
+        self._names_start = _align(position + 8 * block_count + width * self._count)
+        if len(self._mmap) < self._names_start + names_length:
+            raise ValueError('truncated compiled BEL resource: {}'.format(self.path))
+
+        view = memoryview(self._mmap)
+        self._offsets = _read_array(view[position:position + 8 * block_count], 'Q')
+        position += 8 * block_count
+        self._encoding_indexes = _read_array(view[position:position + width * self._count], typecode)
+        view.release()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        for name in ('_offsets', '_encoding_indexes'):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'CompiledResource':  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    def __len__(self) -> int:  # noqa: D105
+        return self._count
+
+    def __contains__(self, name) -> bool:  # noqa: D105
+        return isinstance(name, str) and 0 <= self._find(name)
+
+    def __getitem__(self, name: str) -> Optional[str]:  # noqa: D105
+        index = self._find(name) if isinstance(name, str) else -1
+        if index < 0:
+            raise KeyError(name)
+        return self._encodings[self._encoding_indexes[index]]
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        for _, name in self._iter_block_names(0, self._count):
+            yield name.decode('utf-8')
+
+    def items(self) -> ItemsView:
+        """Get a view of the pairs of names and encodings, which iterates over them sorted by name."""
+        return _CompiledItemsView(self)
+
+    def _iter_items(self) -> Iterator[Tuple[str, Optional[str]]]:
+        for index, name in self._iter_block_names(0, self._count):
+            yield name.decode('utf-8'), self._encodings[self._encoding_indexes[index]]
+
+    def _read_block_head(self, block: int) -> bytes:
+        position = self._names_start + self._offsets[block]
+        length, position = _decode_varint(self._mmap, position)
+        return self._mmap[position:position + length]
+
+    def _iter_block_names(self, block: int, stop: int) -> Iterator[Tuple[int, bytes]]:
+        """Iterate over the indexes and names starting at the given block, until the given index."""
+        index = block * self._block_size
+        if stop <= index:
+            return
+
+        position = self._names_start + self._offsets[block]
+        name = b''
+        while index < stop:
+            if 0 == index % self._block_size:
+                shared = 0
+            else:
+                shared, position = _decode_varint(self._mmap, position)
+            length, position = _decode_varint(self._mmap, position)
+            name = name[:shared] + self._mmap[position:position + length]
+            position += length
+            yield index, name
+            index += 1
+
+    def _find(self, name: str) -> int:
+        """Get the index of the given name, or -1 if it's missing."""
+        key = name.encode('utf-8')
+
+        low, high = 0, len(self._offsets)
+        while low < high:
+            middle = (low + high) // 2
+            if key < self._read_block_head(middle):
+                high = middle
+            else:
+                low = middle + 1
+
+        if 0 == low:
+            return -1
+
+        block = low - 1
+        stop = min(self._count, (block + 1) * self._block_size)
+        for index, candidate in self._iter_block_names(block, stop):
+            if candidate == key:
+                return index
+            if key < candidate:
+                break
+
+        return -1
+
+
+class _CompiledItemsView(ItemsView):
+    """A view of the items of a compiled resource that reads them in one pass instead of looking up each name."""
+
+    def __init__(self, resource: CompiledResource) -> None:  # noqa: D107
+        super().__init__(resource)
+        self._resource = resource
+
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str]]]:  # noqa: D105
+        return self._resource._iter_items()
@@ -8,6 +8,8 @@ from typing import Iterable
 VERSION = '0.0.4-dev'
 
 METADATA_LINE_RE = re.compile(r"(SET\s+DOCUMENT|DEFINE\s+NAMESPACE|DEFINE\s+ANNOTATION)")
+#: Matches the kind, keyword, and URL of a namespace or annotation defined by URL
+DEFINITION_URL_RE = re.compile(r'DEFINE\s+(NAMESPACE|ANNOTATION)\s+("[^"]*"|\S+)\s+AS\s+URL\s+"([^"]*)"')
 
 NAMESPACE_URL_FMT = 'DEFINE NAMESPACE {} AS URL "{}"'
 NAMESPACE_PATTERN_FMT = 'DEFINE NAMESPACE {} AS PATTERN "{}"'
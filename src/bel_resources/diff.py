@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for finding the differences between two versions of a BEL namespace or annotation file.
+
+Since :func:`bel_resources.write_utils.iter_body` writes values sorted by their names, two versions can be
+compared with a single merge over both files in lockstep, which only holds one value from each in memory.
+"""
+
+import logging
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .read_utils import iter_bel_resource, iter_lines
+from .write_utils import iter_external_sorted
+
+__all__ = [
+    'ValueChange',
+    'iter_values_diff',
+    'iter_bel_resources_diff',
+]
+
+log = logging.getLogger(__name__)
+
+Value = Tuple[str, Optional[str]]
+
+#: A name that was ``added``, ``removed``, or ``changed`` between two versions of a resource, with its old
+#: and new encodings. The old encoding of an added name and the new encoding of a removed name are none.
+ValueChange = NamedTuple('ValueChange', [
+    ('change', str),
+    ('name', str),
+    ('old', Optional[str]),
+    ('new', Optional[str]),
+])
+
+
+def iter_bel_resources_diff(old: str, new: str, max_in_memory: Optional[int] = None) -> Iterator[ValueChange]:
+    """Iterate over the names that changed between two versions of a BELNS or BELANNO file, sorted by name.
+
+    :param old: The URL or file path to the old version
+    :param new: The URL or file path to the new version
+    :param max_in_memory: If given, the values of each version are first sorted with
+     :func:`bel_resources.write_utils.iter_external_sorted` keeping at most this many in memory at once. This
+     is only needed for files that weren't written with sorted values.
+    :raises: ValueError if either resource is malformed, or its values aren't sorted and ``max_in_memory``
+     isn't given
+    :raises: requests.exceptions.HTTPError
+    """
+    _, old_values = iter_bel_resource(iter_lines(old))
+    _, new_values = iter_bel_resource(iter_lines(new))
+
+    if max_in_memory is not None:
+        # sort only by name, so the last encoding of a repeated name still comes last
+        old_values = iter_external_sorted(old_values, max_in_memory=max_in_memory, key=itemgetter(0))
+        new_values = iter_external_sorted(new_values, max_in_memory=max_in_memory, key=itemgetter(0))
+
+    yield from iter_values_diff(_iter_checked(old_values, old), _iter_checked(new_values, new))
+
+
+def iter_values_diff(old_values: Iterable[Value], new_values: Iterable[Value]) -> Iterator[ValueChange]:
+    """Iterate over the names that changed between two iterables of pairs of names and encodings sorted by name.
+
+    If a name is repeated, its last encoding is used, like in :func:`bel_resources.parse_bel_resource`.
+    """
+    old_values = _iter_unique(old_values)
+    new_values = _iter_unique(new_values)
+
+    old_value = next(old_values, None)
+    new_value = next(new_values, None)
+
+    while old_value is not None and new_value is not None:
+        old_name, old_encoding = old_value
+        new_name, new_encoding = new_value
+
+        if old_name < new_name:
+            yield ValueChange('removed', old_name, old_encoding, None)
+            old_value = next(old_values, None)
+        elif new_name < old_name:
+            yield ValueChange('added', new_name, None, new_encoding)
+            new_value = next(new_values, None)
+        else:
+            if old_encoding != new_encoding:
+                yield ValueChange('changed', old_name, old_encoding, new_encoding)
+            old_value = next(old_values, None)
+            new_value = next(new_values, None)
+
+    while old_value is not None:
+        yield ValueChange('removed', old_value[0], old_value[1], None)
+        old_value = next(old_values, None)
+
+    while new_value is not None:
+        yield ValueChange('added', new_value[0], None, new_value[1])
+        new_value = next(new_values, None)
+
+
+def _iter_unique(values: Iterable[Value]) -> Iterator[Value]:
+    """Keep the last of each run of values with the same name."""
+    previous = None
+    for value in values:
+        if previous is not None and previous[0] != value[0]:
+            yield previous
+        previous = value
+
+    if previous is not None:
+        yield previous
+
+
+def _iter_checked(values: Iterable[Value], location: str) -> Iterator[Value]:
+    """Pass through values, raising an error as soon as one isn't sorted by name."""
+    previous = None
+    for value in values:
+        if previous is not None and value[0] < previous:
+            raise ValueError('values are not sorted in {}: {} comes after {}'.format(location, value[0], previous))
+        previous = value[0]
+        yield value
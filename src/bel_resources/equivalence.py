@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""A compact index of BEL equivalence (BELEQ) files across namespaces.
+
+Each BELEQ file maps the names in one namespace to UUIDs, where names in different namespaces with the same
+UUID are equivalent. Rather than a dictionary of names to UUID strings for each file, the index keeps each
+UUID as 16 packed bytes and keeps the names of each namespace sorted in a list of interned strings next to
+their packed UUIDs. The members of each UUID are found by a binary search over the packed UUIDs of all names,
+which are sorted once after files are added, next to compact arrays of the namespace and name each came from.
+"""
+
+import heapq
+import logging
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Mapping, Optional, Tuple, Union
+from uuid import UUID
+
+from .read_utils import iter_bel_resource, iter_lines
+
+__all__ = [
+    'EquivalenceIndex',
+]
+
+log = logging.getLogger(__name__)
+
+#: The packed UUIDs of all names, sorted, and the indexes of the namespace and name that each one came from
+Members = Tuple[bytearray, array, array]
+
+
+class EquivalenceIndex:
+    """An index of the equivalences between names in several namespaces from their BELEQ files."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._keywords = []  # type: List[str]
+        self._keyword_indexes = {}  # type: dict
+        #: The sorted names of each namespace
+        self._names = []  # type: List[List[str]]
+        #: The packed UUIDs of the names of each namespace, in the same order
+        self._name_uuids = []  # type: List[bytes]
+
+        #: The members of all UUIDs, which are sorted again when they're needed after namespaces are added
+        self._members = None  # type: Optional[Members]
+        self._uuid_count = 0
+
+    @classmethod
+    def from_resources(cls, locations: Iterable[str]) -> 'EquivalenceIndex':
+        """Build an index from several BELEQ files, using the keywords in their headers."""
+        index = cls()
+        for location in locations:
+            index.add_resource(location)
+        return index
+
+    def __len__(self) -> int:
+        """Count the distinct UUIDs."""
+        self._build_members()
+        return self._uuid_count
+
+    @property
+    def keywords(self) -> List[str]:
+        """The keywords of the namespaces in the index, in the order they were added."""
+        return list(self._keywords)
+
+    def add_resource(self, location: str, keyword: Optional[str] = None) -> None:
+        """Add a BELEQ file, reading its values in a single pass.
+
+        :param location: The URL or file path to a BELEQ file
+        :param keyword: The keyword of its namespace. Defaults to the ``Keyword`` in its ``[Namespace]`` section.
+        :raises: ValueError if the resource is malformed or has no keyword
+        :raises: requests.exceptions.HTTPError
+        """
+        header, values = iter_bel_resource(iter_lines(location))
+        if keyword is None:
+            keyword = header.get('Namespace', {}).get('Keyword')
+            if not keyword:
+                raise ValueError('missing namespace keyword: {}'.format(location))
+        self.add(keyword, values)
+
+    def add(self,
+            keyword: str,
+            values: Union[Iterable[Tuple[str, Optional[str]]], Mapping[str, Optional[str]]],
+            ) -> None:
+        """Add the names of a namespace and their UUIDs.
+
+        :param keyword: The keyword of the namespace
+        :param values: A dictionary of names to their UUIDs or an iterable of pairs of names and their UUIDs,
+         like the ``Values`` entry from :func:`bel_resources.parse_bel_resource` on a BELEQ file
+        :raises: ValueError if the namespace was already added or a UUID is malformed
+        """
+        if keyword in self._keyword_indexes:
+            raise ValueError('namespace already added: {}'.format(keyword))
+
+        if isinstance(values, Mapping):
+            values = values.items()
+
+        pairs = []
+        for name, uuid in values:
+            if uuid is None:
+                log.debug('skipping %s:%s without a UUID', keyword, name)
+                continue
+            pairs.append((sys.intern(name), UUID(uuid).bytes))
+        pairs.sort()
+
+        self._keyword_indexes[keyword] = len(self._keywords)
+        self._keywords.append(keyword)
+        self._names.append([name for name, _ in pairs])
+        self._name_uuids.append(b''.join(packed for _, packed in pairs))
+        self._members = None
+
+    def _get_packed_uuid(self, keyword_index: int, name: str) -> Optional[bytes]:
+        names = self._names[keyword_index]
+        position = bisect_left(names, name)
+        if position < len(names) and names[position] == name:
+            return self._name_uuids[keyword_index][16 * position:16 * position + 16]
+        return None
+
+    def get_uuid(self, keyword: str, name: str) -> Optional[str]:
+        """Get the UUID of a name, or none if it's missing.
+
+        :raises: KeyError if the namespace wasn't added
+        """
+        packed = self._get_packed_uuid(self._keyword_indexes[keyword], name)
+        if packed is None:
+            return None
+        return str(UUID(bytes=packed))
+
+    def get_members(self, uuid: str) -> List[Tuple[str, str]]:
+        """Get the pairs of namespace keywords and names that have the given UUID."""
+        return [
+            (self._keywords[keyword_index], self._names[keyword_index][name_index])
+            for keyword_index, name_index in self._iter_members(UUID(uuid).bytes)
+        ]
+
+    def translate(self, keyword: str, name: str, target: str) -> Optional[str]:
+        """Get an equivalent name in the target namespace, or none if there isn't one.
+
+        :raises: KeyError if either namespace wasn't added
+        """
+        return self.translate_many(keyword, [name], target)[0]
+
+    def translate_many(self, keyword: str, names: Iterable[str], target: str) -> List[Optional[str]]:
+        """Get equivalent names in the target namespace for several names at once.
+
+        :param keyword: The keyword of the namespace of the names
+        :param names: An iterable of names
+        :param target: The keyword of the namespace to translate to
+        :return: A list with, for each of the given names, an equivalent name in the target namespace, or none
+         if there isn't one. If a name is equivalent to several, the first in sorted order is used.
+        :raises: KeyError if either namespace wasn't added
+        """
+        keyword_index = self._keyword_indexes[keyword]
+        target_index = self._keyword_indexes[target]
+        target_names = self._names[target_index]
+
+        rv = []  # type: List[Optional[str]]
+        for name in names:
+            packed = self._get_packed_uuid(keyword_index, name)
+            if packed is None:
+                rv.append(None)
+                continue
+            rv.append(next(
+                (
+                    target_names[name_index]
+                    for member_keyword_index, name_index in self._iter_members(packed)
+                    if member_keyword_index == target_index
+                ),
+                None,
+            ))
+        return rv
+
+    def _iter_members(self, packed: bytes) -> Iterable[Tuple[int, int]]:
+        uuids, keyword_indexes, name_indexes = self._build_members()
+        position = _bisect_packed(uuids, packed)
+        while 16 * position < len(uuids) and uuids[16 * position:16 * position + 16] == packed:
+            yield keyword_indexes[position], name_indexes[position]
+            position += 1
+
+    def _build_members(self) -> Members:
+        """Sort the packed UUIDs of all names, keeping where each one came from, if any were added since."""
+        if self._members is not None:
+            return self._members
+
+        uuids = bytearray()
+        keyword_indexes = array('H')
+        name_indexes = array('I')
+        self._uuid_count = 0
+
+        previous = None
+        for packed, keyword_index, name_index in heapq.merge(*(
+            _iter_sorted_origins(keyword_index, name_uuids)
+            for keyword_index, name_uuids in enumerate(self._name_uuids)
+        )):
+            if packed != previous:
+                self._uuid_count += 1
+                previous = packed
+            uuids += packed
+            keyword_indexes.append(keyword_index)
+            name_indexes.append(name_index)
+
+        self._members = uuids, keyword_indexes, name_indexes
+        return self._members
+
+
+def _iter_sorted_origins(keyword_index: int, name_uuids: bytes) -> Iterable[Tuple[bytes, int, int]]:
+    """Iterate over the packed UUIDs of a namespace in sorted order with the namespace and name they came from."""
+    name_indexes = sorted(
+        range(len(name_uuids) // 16),
+        key=lambda name_index: name_uuids[16 * name_index:16 * name_index + 16],
+    )
+    for name_index in name_indexes:
+        yield name_uuids[16 * name_index:16 * name_index + 16], keyword_index, name_index
+
+
+def _bisect_packed(data: Union[bytes, bytearray], key: bytes, width: int = 16) -> int:
+    """Get the position of the first record in the sorted, packed records that isn't less than the key."""
+    low, high = 0, len(data) // width
+    while low < high:
+        middle = (low + high) // 2
+        if data[width * middle:width * middle + width] < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
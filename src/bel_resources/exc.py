@@ -38,3 +38,22 @@ class EmptyResourceError(ResourceError):
 
     def __str__(self):  # noqa: D105
         return 'Downloaded empty resource at {}'.format(self.location)
+
+
+class UnfinishedLineError(RuntimeError):
+    """Raised when the lines of a BEL Script end in the middle of a logical line."""
+
+    def __init__(self, line_number: int):  # noqa: D107
+        """Initialize the UnfinishedLineError.
+
+        :param line_number: The line number of the first line of the unfinished logical line
+        """
+        super().__init__(line_number)
+
+    @property
+    def line_number(self) -> int:  # noqa: D401
+        """The line number of the first line of the unfinished logical line."""
+        return self.args[0]
+
+    def __str__(self):  # noqa: D105
+        return 'unfinished line starting on line {}'.format(self.line_number)
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+
+"""Indexes for looking up names in parsed BEL namespace and annotation files."""
+
+import logging
+import pickle
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+__all__ = [
+    'NamespaceIndex',
+    'PrefixIndex',
+    'FuzzyIndex',
+    'is_case_sensitive',
+]
+
+log = logging.getLogger(__name__)
+
+#: A pair of a name, as it's written in the resource, and its encoding
+Entry = Tuple[str, Optional[str]]
+
+#: The positions of the names containing each n-gram
+Postings = Dict[str, array]
+
+
+def is_case_sensitive(resource: Mapping) -> bool:
+    """Check if a parsed resource should be interpreted as case-sensitive with its ``CaseSensitiveFlag``."""
+    return resource.get('Processing', {}).get('CaseSensitiveFlag', 'yes').strip().lower() != 'no'
+
+
+class NamespaceIndex:
+    """An index of the names in a namespace that honors its case sensitivity.
+
+    If the namespace is case-insensitive, the casefolded names are computed once when the index is built.
+    In both cases the original values are referenced rather than copied.
+    """
+
+    def __init__(self, values: Mapping[str, Optional[str]], case_sensitive: bool = True) -> None:
+        """Build the index.
+
+        :param values: A dictionary of names to their encodings, like the ``Values`` entry from
+         :func:`bel_resources.parse_bel_resource`
+        :param case_sensitive: Should names be matched case-sensitively?
+        """
+        self.values = values
+        self.case_sensitive = case_sensitive
+
+        if case_sensitive:
+            self._folded = None  # type: Optional[Dict[str, str]]
+        else:
+            self._folded = {}
+            for name in sorted(values):
+                folded = name.casefold()
+                if folded in self._folded:
+                    log.debug('ignoring %s since it is the same as %s ignoring case', name, self._folded[folded])
+                    continue
+                self._folded[folded] = name
+
+    @classmethod
+    def from_resource(cls, resource: Mapping) -> 'NamespaceIndex':
+        """Build an index from the result of :func:`bel_resources.get_bel_resource`, using its ``CaseSensitiveFlag``."""
+        return cls(resource['Values'], case_sensitive=is_case_sensitive(resource))
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.values)
+
+    def __contains__(self, name: str) -> bool:  # noqa: D105
+        return self.normalize(name) is not None
+
+    def normalize(self, name: str) -> Optional[str]:
+        """Get the name as it's written in the namespace, or none if it's missing."""
+        if self._folded is not None:
+            return self._folded.get(name.casefold())
+        if name in self.values:
+            return name
+        return None
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the encoding for a name, or the default if it's missing."""
+        entry = self.lookup(name)
+        return default if entry is None else entry[1]
+
+    def __getitem__(self, name: str) -> Optional[str]:  # noqa: D105
+        entry = self.lookup(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry[1]
+
+    def lookup(self, name: str) -> Optional[Entry]:
+        """Get the name as it's written in the namespace and its encoding, or none if it's missing."""
+        normalized = self.normalize(name)
+        if normalized is None:
+            return None
+        return normalized, self.values[normalized]
+
+    def lookup_many(self, names: Iterable[str]) -> List[Optional[Entry]]:
+        """Look up several names at once.
+
+        :param names: An iterable of names
+        :return: A list with, for each of the given names, either a pair of the name as it's written in the
+         namespace and its encoding, or none if it's missing
+        """
+        values = self.values
+
+        if self._folded is None:
+            return [
+                (name, values[name]) if name in values else None
+                for name in names
+            ]
+
+        folded_get = self._folded.get
+        rv = []
+        for name in names:
+            normalized = folded_get(name.casefold())
+            rv.append(None if normalized is None else (normalized, values[normalized]))
+        return rv
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """Get the names that are not in the namespace, in the order they are given."""
+        names = list(names)
+        return [
+            name
+            for name, entry in zip(names, self.lookup_many(names))
+            if entry is None
+        ]
+
+
+class PrefixIndex:
+    """A sorted-array index of the names in a namespace for autocompletion.
+
+    A query is a binary search for the first name starting with the prefix followed by a scan
+    over the next names, so it takes time proportional to the length of the prefix, the logarithm of
+    the number of names, and the number of results. The index can be saved with :meth:`dump` and
+    reloaded with :meth:`load` so it doesn't have to be rebuilt.
+    """
+
+    _version = 1
+
+    def __init__(self, names: Iterable[str], case_sensitive: bool = True) -> None:
+        """Build the index.
+
+        :param names: An iterable of names, like the ``Values`` entry from :func:`bel_resources.parse_bel_resource`
+        :param case_sensitive: Should prefixes be matched case-sensitively?
+        """
+        self.case_sensitive = case_sensitive
+
+        if case_sensitive:
+            self._keys = self._names = sorted(set(names))
+        else:
+            pairs = sorted({(name.casefold(), name) for name in names})
+            self._keys = [key for key, _ in pairs]
+            self._names = [name for _, name in pairs]
+
+    @classmethod
+    def from_resource(cls, resource: Mapping) -> 'PrefixIndex':
+        """Build an index from the result of :func:`bel_resources.get_bel_resource`, using its ``CaseSensitiveFlag``."""
+        return cls(resource['Values'], case_sensitive=is_case_sensitive(resource))
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._names)
+
+    def search(self, prefix: str, k: Optional[int] = 10) -> List[str]:
+        """Get the names starting with the given prefix, in sorted order.
+
+        :param prefix: The beginning of a name
+        :param k: The maximum number of names to return. If none, returns all of them.
+        """
+        if not self.case_sensitive:
+            prefix = prefix.casefold()
+
+        keys = self._keys
+        names = self._names
+
+        rv = []  # type: List[str]
+        for index in range(bisect_left(keys, prefix), len(keys)):
+            if (k is not None and k <= len(rv)) or not keys[index].startswith(prefix):
+                break
+            rv.append(names[index])
+
+        return rv
+
+    def dump(self, path: str) -> None:
+        """Save the index to a file."""
+        names = None if self._names is self._keys else self._names
+        with open(path, 'wb') as file:
+            pickle.dump((self._version, self.case_sensitive, self._keys, names), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'PrefixIndex':
+        """Load an index saved with :meth:`dump`.
+
+        :raises: ValueError if the file was saved by an incompatible version
+        """
+        with open(path, 'rb') as file:
+            version, case_sensitive, keys, names = pickle.load(file)
+
+        if version != cls._version:
+            raise ValueError('incompatible prefix index version: {}'.format(version))
+
+        index = cls.__new__(cls)
+        index.case_sensitive = case_sensitive
+        index._keys = keys
+        index._names = keys if names is None else names
+        return index
+
+
+class FuzzyIndex:
+    """An n-gram index of the names in a namespace for suggesting the closest ones to a misspelled name.
+
+    Each name is split into overlapping n-grams, which point back to the names containing them.
+    A query reads the posting lists of its n-grams from the rarest to the most common until a budget of
+    postings is spent, counts how many of them each name shares with the query, then only computes the
+    edit distance to the names sharing the most. Both the postings read and the names compared are bounded,
+    so the latency of a query doesn't grow with the size of the namespace. Common n-grams, like the padded
+    first letter of a name, are the ones left out, and they say the least about which names are close.
+    The index can be saved with :meth:`dump` and reloaded with :meth:`load`, for example next to the
+    resource it was built from.
+    """
+
+    _version = 1
+
+    def __init__(self, names: Iterable[str], case_sensitive: bool = True, n: int = 3) -> None:
+        """Build the index.
+
+        :param names: An iterable of names, like the ``Values`` entry from :func:`bel_resources.parse_bel_resource`
+        :param case_sensitive: Should names be compared case-sensitively?
+        :param n: The length of the n-grams
+        """
+        self.case_sensitive = case_sensitive
+        self.n = n
+
+        self._names = sorted(set(names))
+        self._keys = self._names if case_sensitive else [name.casefold() for name in self._names]
+
+        self._postings = {}  # type: Postings
+        for index, key in enumerate(self._keys):
+            for gram in self._get_grams(key):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array('I')
+                posting.append(index)
+
+    @classmethod
+    def from_resource(cls, resource: Mapping, n: int = 3) -> 'FuzzyIndex':
+        """Build an index from the result of :func:`bel_resources.get_bel_resource`, using its ``CaseSensitiveFlag``."""
+        return cls(resource['Values'], case_sensitive=is_case_sensitive(resource), n=n)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._names)
+
+    def _get_grams(self, key: str) -> Set[str]:
+        padded = '$' * (self.n - 1) + key + '$' * (self.n - 1)
+        return {
+            padded[i:i + self.n]
+            for i in range(len(padded) - self.n + 1)
+        }
+
+    def suggest(self,
+                name: str,
+                k: int = 5,
+                max_distance: Optional[int] = None,
+                max_candidates: int = 200,
+                max_postings: Optional[int] = 10000,
+                ) -> List[Tuple[str, int]]:
+        """Get the names closest to the given name.
+
+        :param name: A name that's possibly misspelled
+        :param k: The maximum number of suggestions
+        :param max_distance: The maximum edit distance of a suggestion. If none, only ``max_candidates`` bounds it.
+        :param max_candidates: The maximum number of names whose edit distance is computed
+        :param max_postings: The maximum number of postings read, from the rarest n-grams first. If even the
+         rarest n-gram has more, only its first ones are read. If none, all of them are read.
+        :return: A list of pairs of names and their edit distance to the given name, closest first
+        """
+        key = name if self.case_sensitive else name.casefold()
+        counts = self._count_shared_grams(key, max_postings)
+
+        suggestions = []
+        for index, _ in counts.most_common(max_candidates):
+            distance = self._get_distance(key, index, max_distance)
+            if distance is not None:
+                suggestions.append((distance, self._names[index]))
+
+        return [
+            (suggestion, distance)
+            for distance, suggestion in sorted(suggestions)[:k]
+        ]
+
+    def _count_shared_grams(self, key: str, max_postings: Optional[int]) -> Counter:
+        """Count the n-grams each name shares with the key, reading the postings of the rarest n-grams first."""
+        postings = [
+            self._postings[gram]
+            for gram in self._get_grams(key)
+            if gram in self._postings
+        ]
+        postings.sort(key=len)
+
+        if max_postings is not None and postings and max_postings < len(postings[0]):
+            return Counter(postings[0][:max_postings])
+
+        counts = Counter()  # type: Counter
+        read = 0
+        for posting in postings:
+            read += len(posting)
+            if max_postings is not None and max_postings < read:
+                break
+            counts.update(posting)
+
+        return counts
+
+    def _get_distance(self, key: str, index: int, max_distance: Optional[int]) -> Optional[int]:
+        candidate = self._keys[index]
+        if max_distance is not None and max_distance < abs(len(candidate) - len(key)):
+            return None
+        return _get_edit_distance(key, candidate, max_distance)
+
+    def suggest_many(self, names: Iterable[str], **kwargs) -> List[List[Tuple[str, int]]]:
+        """Get the closest names for several names at once, with the same arguments as :meth:`suggest`."""
+        return [
+            self.suggest(name, **kwargs)
+            for name in names
+        ]
+
+    def dump(self, path: str) -> None:
+        """Save the index to a file."""
+        with open(path, 'wb') as file:
+            pickle.dump(
+                (self._version, self.case_sensitive, self.n, self._names, self._postings),
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'FuzzyIndex':
+        """Load an index saved with :meth:`dump`.
+
+        :raises: ValueError if the file was saved by an incompatible version
+        """
+        with open(path, 'rb') as file:
+            version, case_sensitive, n, names, postings = pickle.load(file)
+
+        if version != cls._version:
+            raise ValueError('incompatible fuzzy index version: {}'.format(version))
+
+        index = cls.__new__(cls)
+        index.case_sensitive = case_sensitive
+        index.n = n
+        index._names = names
+        index._keys = names if case_sensitive else [name.casefold() for name in names]
+        index._postings = postings
+        return index
+
+
+def _get_edit_distance(a: str, b: str, max_distance: Optional[int] = None) -> Optional[int]:
+    """Get the Levenshtein distance between two strings, or none if it's more than the maximum distance."""
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, start=1):
+        current = [i]
+        for j, b_char in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a_char != b_char),
+            ))
+        if max_distance is not None and max_distance < min(current):
+            return None
+        previous = current
+
+    distance = previous[-1]
+    if max_distance is not None and max_distance < distance:
+        return None
+    return distance
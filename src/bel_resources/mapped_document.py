@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""A memory-mapped reader for BEL Script that keeps logical lines as offsets.
+
+Instead of a string and a tuple for each line, the logical lines are kept as the positions of their first
+and last bytes in the file and their line numbers, in compact arrays. Their text is only decoded when it's
+asked for, so counting, indexing, or filtering the statements of a document doesn't copy it.
+"""
+
+import logging
+import mmap
+import re
+from array import array
+from typing import Iterable, Iterator, Optional, Pattern, Tuple, Union
+
+from .constants import METADATA_LINE_RE
+from .exc import UnfinishedLineError
+from .read_document import EnumLines, sanitize_file_lines_fast
+
+__all__ = [
+    'MappedBELScript',
+]
+
+log = logging.getLogger(__name__)
+
+_BACKSLASH = ord('\\')
+_QUOTE = ord('"')
+_HASH = ord('#')
+_NON_ASCII = 0x80
+
+Buffer = Union[bytes, mmap.mmap]
+
+_DOCUMENT_LINE_RE = re.compile(b'SET DOCUMENT')
+_METADATA_LINE_RE = re.compile(METADATA_LINE_RE.pattern.encode('utf-8'))
+
+
+def _iter_stripped_lines(data: Buffer) -> Iterator[Tuple[int, int, bytes]]:
+    """Iterate over the line numbers, the positions of the first stripped bytes, and the stripped bytes of the lines.
+
+    Blank lines are skipped. Lines are stripped of the same whitespace as :meth:`str.strip`, which also
+    includes non-ASCII whitespace like no-break spaces.
+    """
+    size = len(data)
+    position = line_number = 0
+    while position < size:
+        line_number += 1
+        newline = data.find(b'\n', position)
+        if newline < 0:
+            newline = size
+        raw = data[position:newline]
+        line = raw.strip()
+        if line and (_NON_ASCII <= line[0] or _NON_ASCII <= line[-1]):
+            start, line = _strip_unicode(raw, position)
+        else:
+            start = position + len(raw) - len(raw.lstrip())
+        position = newline + 1
+
+        if line:
+            yield line_number, start, line
+
+
+def _strip_unicode(raw: bytes, position: int) -> Tuple[int, bytes]:
+    """Strip a line of all the whitespace that :meth:`str.strip` strips, returning its new start and bytes."""
+    text = raw.decode('utf-8', 'surrogateescape')
+    stripped = text.strip()
+    if not stripped:
+        return position, b''
+    leading = text[:len(text) - len(text.lstrip())]
+    start = position + len(leading.encode('utf-8', 'surrogateescape'))
+    return start, stripped.encode('utf-8', 'surrogateescape')
+
+
+def _get_continuation_mode(line: bytes) -> int:
+    """Get the mode of a line that might start a logical line continuing over several physical lines."""
+    if line[-1] == _BACKSLASH:
+        return 1
+    if 1 == line.count(b'"'):
+        return 2
+    return 0
+
+
+def _ends_continuation(mode: int, line: bytes) -> bool:
+    """Check if a line ends the logical line being continued in the given mode."""
+    if mode == 1:
+        return line[-1] != _BACKSLASH
+    return line[-1] == _QUOTE
+
+
+class MappedBELScript:
+    """A sequence of the logical lines of a memory-mapped BEL Script.
+
+    The logical lines are the same as the ones from :func:`bel_resources.read_document.sanitize_file_lines`.
+    A logical line that is written on a single physical line is stored as the positions of its text, without
+    the surrounding whitespace and the trailing comment, so it is decoded with a single slice. A logical line
+    that continues over several physical lines is stored as the positions of all of them, and is sanitized
+    again when it's decoded.
+    """
+
+    def __init__(self, path: str, note_char: str = ':') -> None:
+        """Map a BEL Script and find its logical lines.
+
+        :param path: The path to a BEL Script
+        :param note_char: The character sequence denoting a special note
+        :raises: UnfinishedLineError if the file ends in the middle of a logical line
+        """
+        self.path = path
+
+        self._mmap = None  # type: Optional[mmap.mmap]
+        with open(path, 'rb') as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files can't be mapped
+                pass
+
+        self._data = b'' if self._mmap is None else self._mmap  # type: Buffer
+        self._view = memoryview(self._data)
+
+        #: The position of the first byte of each logical line
+        self._starts = array('Q')
+        #: The number of bytes of each logical line
+        self._lengths = array('I')
+        #: The line number of the first physical line of each logical line
+        self._line_numbers = array('I')
+        #: Whether each logical line continues over several physical lines
+        self._multiline = bytearray()
+
+        try:
+            self._index(('#' + note_char).encode('utf-8'))
+        except UnfinishedLineError:
+            self.close()
+            raise
+
+    def _index(self, note: bytes) -> None:
+        """Find the logical lines with the same rules as :func:`bel_resources.read_document.sanitize_file_lines`."""
+        # 0 if not continuing a line, 1 if continuing after a backslash, 2 if continuing an unbalanced quote
+        mode = 0
+        span_start = span_line_number = 0
+
+        for line_number, start, line in _iter_stripped_lines(self._data):
+            if line[0] == _HASH:
+                if line.startswith(note):
+                    log.info('NOTE: Line %d: %s', line_number, line.decode('utf-8', 'replace'))
+                continue
+
+            end = start + len(line)
+
+            if mode == 0:
+                mode = _get_continuation_mode(line)
+                if mode != 0:
+                    span_start, span_line_number = start, line_number
+                    continue
+
+                comment_loc = line.rfind(b' //')
+                if 0 <= comment_loc:
+                    end = start + comment_loc
+
+                self._append(start, end, line_number, False)
+
+            elif _ends_continuation(mode, line):
+                mode = 0
+                self._append(span_start, end, span_line_number, True)
+
+        if mode != 0:
+            raise UnfinishedLineError(span_line_number)
+
+    def _append(self, start: int, end: int, line_number: int, multiline: bool) -> None:
+        self._starts.append(start)
+        self._lengths.append(end - start)
+        self._line_numbers.append(line_number)
+        self._multiline.append(multiline)
+
+    def close(self) -> None:
+        """Release the memory map.
+
+        :raises: BufferError if views from :meth:`get_bytes` are still referenced
+        """
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> 'MappedBELScript':  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._starts)
+
+    def __getitem__(self, index: int) -> str:
+        """Decode a logical line."""
+        start = self._starts[index]
+        text = self._data[start:start + self._lengths[index]].decode('utf-8')
+        if not self._multiline[index]:
+            return text
+        _, line = next(iter(sanitize_file_lines_fast(text.split('\n'))))
+        return line
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_line_number(self, index: int) -> int:
+        """Get the line number of the first physical line of a logical line."""
+        return self._line_numbers[index]
+
+    def is_multiline(self, index: int) -> bool:
+        """Check if a logical line continues over several physical lines."""
+        return bool(self._multiline[index])
+
+    def get_bytes(self, index: int) -> memoryview:
+        """Get a view of the bytes of a logical line without copying them.
+
+        If the logical line continues over several physical lines, the view covers all of them as they
+        are written. The view must be released before the script is closed.
+        """
+        start = self._starts[index]
+        return self._view[start:start + self._lengths[index]]
+
+    def iter_lines(self, indexes: Optional[Iterable[int]] = None) -> EnumLines:
+        """Iterate over pairs of line numbers and decoded logical lines, like :func:`sanitize_file_lines`.
+
+        :param indexes: The indexes of the logical lines. Defaults to all of them.
+        """
+        if indexes is None:
+            indexes = range(len(self))
+        for index in indexes:
+            yield self._line_numbers[index], self[index]
+
+    def match(self, pattern: Pattern, indexes: Optional[Iterable[int]] = None) -> Iterable[int]:
+        """Iterate over the indexes of the logical lines that start with a match of a bytes regular expression.
+
+        The expression is matched against the mapped file, so no lines are decoded or copied.
+
+        :param pattern: A compiled regular expression over bytes
+        :param indexes: The indexes of the logical lines to check. Defaults to all of them.
+        """
+        if indexes is None:
+            indexes = range(len(self))
+        data, starts, lengths = self._data, self._starts, self._lengths
+        for index in indexes:
+            start = starts[index]
+            if pattern.match(data, start, start + lengths[index]):
+                yield index
+
+    def split(self) -> Tuple[range, range, range]:
+        """Get the ranges of the indexes of the metadata, definitions, and statements.
+
+        The ranges are the same as the parts from :func:`split_file_to_annotations_and_definitions`.
+        """
+        count = len(self)
+
+        metadata_end = 0
+        while metadata_end < count and self._matches(_DOCUMENT_LINE_RE, metadata_end):
+            metadata_end += 1
+
+        # the line that ends the metadata always goes with the definitions
+        definitions_end = min(count, metadata_end + 1)
+        while definitions_end < count and self._matches(_METADATA_LINE_RE, definitions_end):
+            definitions_end += 1
+
+        return range(0, metadata_end), range(metadata_end, definitions_end), range(definitions_end, count)
+
+    def _matches(self, pattern: Pattern, index: int) -> bool:
+        if self._multiline[index]:
+            return bool(pattern.match(self[index].encode('utf-8')))
+        start = self._starts[index]
+        return bool(pattern.match(self._data, start, start + self._lengths[index]))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for merging several BEL namespace files into one.
+
+The values of each namespace are read lazily in sorted order, like they are written by
+:func:`bel_resources.write_utils.iter_body`, and merged with a k-way merge, so only one value from each
+namespace is held in memory at a time.
+"""
+
+import heapq
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .diff import _iter_checked
+from .read_utils import iter_bel_resource, iter_lines
+from .write_namespace import write_namespace
+from .write_utils import iter_external_sorted
+
+__all__ = [
+    'iter_merged_values',
+    'merge_namespaces',
+]
+
+Value = Tuple[str, Optional[str]]
+
+
+def merge_namespaces(locations: Iterable[str],
+                     namespace_name: str,
+                     namespace_keyword: str,
+                     max_in_memory: Optional[int] = None,
+                     **kwargs
+                     ) -> None:
+    """Write the union of several BELNS files as a new namespace.
+
+    The encodings of a name that's in several of the namespaces are combined.
+
+    :param locations: The URLs or file paths to BELNS files
+    :param namespace_name: The name of the merged namespace
+    :param namespace_keyword: The keyword of the merged namespace
+    :param max_in_memory: If given, the values of each namespace are first sorted with
+     :func:`bel_resources.write_utils.iter_external_sorted` keeping at most this many in memory at once. This
+     is only needed for files that weren't written with sorted values.
+    :param kwargs: The other arguments of :func:`bel_resources.write_namespace`, like the header information
+     and the ``file`` to write to
+    :raises: ValueError if a resource is malformed, or its values aren't sorted and ``max_in_memory``
+     isn't given
+    :raises: requests.exceptions.HTTPError
+    """
+    values_iterables = []
+    for location in locations:
+        _, values = iter_bel_resource(iter_lines(location))
+        if max_in_memory is not None:
+            values = iter_external_sorted(values, max_in_memory=max_in_memory, key=itemgetter(0))
+        values_iterables.append(_iter_checked(values, location))
+
+    write_namespace(
+        iter_merged_values(values_iterables),
+        namespace_name,
+        namespace_keyword,
+        presorted=True,
+        **kwargs
+    )
+
+
+def iter_merged_values(values_iterables: Iterable[Iterable[Value]]) -> Iterator[Tuple[str, str]]:
+    """Merge iterables of pairs of names and encodings sorted by name, combining the encodings of each name.
+
+    :param values_iterables: Iterables of pairs of names and their encodings, each sorted by name
+    :return: An iterator over pairs of names and the sorted union of the characters of their encodings,
+     sorted by name
+    """
+    merged = heapq.merge(*values_iterables, key=itemgetter(0))
+    for name, values in groupby(merged, key=itemgetter(0)):
+        encoding = set()  # type: set
+        for _, value in values:
+            if value:
+                encoding.update(value)
+        yield name, ''.join(sorted(encoding))
@@ -1,50 +1,188 @@
 # -*- coding: utf-8 -*-
 
-"""Utilities for handling OBO."""
+"""Utilities for handling OBO.
 
-from typing import Callable, Optional, TextIO, Union
+OBO files are read with a streaming stanza reader that only keeps the tags of each term that are needed,
+one term at a time. Building a graph with :mod:`obonet`, which needs :mod:`networkx`, is only needed for
+an :data:`EncodingFunction` that looks at the rest of the graph.
+"""
 
-import networkx as nx
-import obonet
-from tqdm import tqdm
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, Union
 
+try:
+    import networkx as nx
+except ImportError:  # networkx is only needed to convert graphs from obonet
+    nx = None
+
+from .read_utils import iter_lines
 from .write_annotation import write_annotation
 from .write_namespace import write_namespace
 
 __all__ = [
+    'iter_obo_terms',
     'convert_obo_to_belns',
+    'convert_obo_terms_to_belns',
     'convert_obo_graph_to_belns',
     'convert_obo_to_belanno',
+    'convert_obo_terms_to_belanno',
     'convert_obo_graph_to_belanno',
+    'convert_obo_to_bel_resources',
+    'convert_obo_graph_to_bel_resources',
 ]
 
-EncodingFunction = Callable[[nx.MultiDiGraph, str], str]
+#: A function from a :class:`networkx.MultiDiGraph` from :mod:`obonet` and a node to its encoding
+EncodingFunction = Callable[['nx.MultiDiGraph', str], str]
+
+#: An OBO stanza as a dictionary of its tags to their values, which are strings for the :data:`SINGULAR_TAGS`
+#: and lists of strings for the others
+Stanza = Dict[str, Any]
+
+#: The tags kept for each term by default
+DEFAULT_TERM_TAGS = frozenset({'id', 'name', 'is_obsolete'})
+
+#: The tags that only have one value, like in :mod:`obonet`. The others are kept as lists.
+SINGULAR_TAGS = frozenset({
+    'format-version', 'data-version', 'version', 'ontology', 'date', 'saved-by', 'auto-generated-by',
+    'default-relationship-id-prefix',
+    'id', 'is_anonymous', 'name', 'namespace', 'def', 'comment', 'is_obsolete', 'builtin', 'created_by',
+    'creation_date',
+})
+
+# the same pattern as obonet for splitting a tag line into its tag, value, trailing modifier, and comment
+_TAG_LINE_RE = re.compile(
+    r'^(?P<tag>.+?): *(?P<value>.+?) ?(?P<trailing_modifier>(?<!\\)\{.*?(?<!\\)\})? ?(?P<comment>(?<!\\)!.*?)?$',
+)
+
+
+def iter_obo_terms(lines: Iterable[str],
+                   tags: Optional[Iterable[str]] = DEFAULT_TERM_TAGS,
+                   ) -> Tuple[Stanza, Iterator[Stanza]]:
+    """Parse the header of an OBO file then lazily iterate over its terms in a single pass.
+
+    Like :func:`obonet.read_obo`, obsolete terms are skipped and ``[Typedef]`` and ``[Instance]`` stanzas are
+    ignored.
+
+    :param lines: An iterable over the lines in an OBO file
+    :param tags: The tags to keep for each term. If none, keeps all of them.
+    :return: A pair of a dictionary of the header tags and an iterator over dictionaries of the kept tags
+     of each term
+    """
+    lines = iter(lines)
+    if tags is not None:
+        tags = frozenset(tags) | {'is_obsolete'}
+
+    header = {}  # type: Stanza
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('['):
+            return header, _iter_terms(line, lines, tags)
+        if line.strip() and not line.startswith('!'):
+            _add_tag_line(header, line)
+
+    return header, iter(())
+
+
+def _iter_terms(stanza_line: str, lines: Iterator[str], tags: Optional[frozenset]) -> Iterator[Stanza]:
+    is_term = stanza_line.startswith('[Term]')
+    term = {}  # type: Stanza
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.startswith('['):
+            if is_term and _is_current(term):
+                yield term
+            is_term = line.startswith('[Term]')
+            term = {}
+        elif is_term and _is_kept_tag_line(line, tags):
+            _add_tag_line(term, line)
+
+    if is_term and _is_current(term):
+        yield term
+
+
+def _is_current(term: Stanza) -> bool:
+    """Check if a term has any tags and isn't obsolete."""
+    return bool(term) and term.get('is_obsolete') != 'true'
+
+
+def _is_kept_tag_line(line: str, tags: Optional[frozenset]) -> bool:
+    """Check if a line in a stanza is a tag line for one of the given tags, or for any tag if none are given."""
+    if not line.strip() or line.startswith('!'):
+        return False
+    return tags is None or line.partition(':')[0] in tags
+
+
+def _add_tag_line(stanza: Stanza, line: str) -> None:
+    match = _TAG_LINE_RE.match(line)
+    if match is None:
+        raise ValueError('Tag-value pair parsing failed for:\n{}'.format(line))
+    tag, value = match.group('tag'), match.group('value')
+    if tag in SINGULAR_TAGS:
+        stanza[tag] = value
+    else:
+        stanza.setdefault(tag, []).append(value)
+
+
+def _get_namespace_name(ontology: str) -> str:
+    if ontology.endswith('.obo'):
+        return ontology[:-len('.obo')]
+    return ontology
 
 
 def convert_obo_to_belns(
     url: str,
     path: str,
     use_names: bool = False,
-    encoding: Union[str, EncodingFunction] = None,
+    encoding: Union[None, str, EncodingFunction] = None,
 ) -> None:
-    """Convert an OBO file to a BEL namespace."""
-    graph = obonet.read_obo(url)
+    """Convert an OBO file to a BEL namespace.
+
+    The file is streamed with :func:`iter_obo_terms` unless the encoding is a function, which needs the
+    graph from :mod:`obonet`.
+    """
+    if callable(encoding):
+        import obonet
+        graph = obonet.read_obo(url)
+        with open(path, 'w') as file:
+            convert_obo_graph_to_belns(graph, file=file, use_names=use_names, encoding=encoding)
+        return
+
+    header, terms = iter_obo_terms(iter_lines(url))
     with open(path, 'w') as file:
-        convert_obo_graph_to_belns(graph, file=file, use_names=use_names, encoding=encoding)
+        convert_obo_terms_to_belns(header, terms, file=file, use_names=use_names, encoding=encoding)
+
+
+def convert_obo_terms_to_belns(
+    header: Stanza,
+    terms: Iterable[Stanza],
+    file: Union[None, str, TextIO] = None,
+    use_names: bool = False,
+    encoding: Optional[str] = None,
+    process_identifiers: Optional[Callable[[str], str]] = None,
+) -> None:
+    """Convert the terms from :func:`iter_obo_terms` to a BELNS file, like :func:`convert_obo_graph_to_belns`."""
+    _export(
+        header['ontology'],
+        header['data-version'],
+        ((term['id'], term) for term in terms),
+        encode=_constant_encoder(encoding),
+        names_file=file,
+        identifiers_file=file,
+        process_identifiers=process_identifiers,
+        include_names=use_names,
+        include_identifiers=not use_names,
+    )
 
 
 def convert_obo_graph_to_belns(
-    graph: nx.MultiDiGraph,
+    graph: 'nx.MultiDiGraph',
     file: Optional[TextIO] = None,
     use_names: bool = False,
     encoding: Union[None, str, EncodingFunction] = None,
     process_identifiers: Optional[Callable[[str], str]] = None,
 ) -> None:
     """Convert a graph from :mod:`obonet` to a BELNS file."""
-    name = graph.graph['name']
-    if name.endswith('.obo'):
-        name = name[:-len('.obo')]
-
+    name = _get_namespace_name(graph.graph['name'])
     ontology = graph.graph['ontology']
 
     if encoding is None:
@@ -91,17 +229,37 @@ def convert_obo_graph_to_belns(
 
 
 def convert_obo_to_belanno(url: str, path: str):
-    """Convert an OBO file to a BEL annotation."""
-    graph = obonet.read_obo(url)
+    """Convert an OBO file to a BEL annotation, streaming it with :func:`iter_obo_terms`."""
+    header, terms = iter_obo_terms(iter_lines(url), tags=DEFAULT_TERM_TAGS | {'description'})
     with open(path, 'w') as file:
-        convert_obo_graph_to_belanno(graph, file=file)
+        convert_obo_terms_to_belanno(header, terms, file=file)
+
+
+def convert_obo_terms_to_belanno(
+    header: Stanza,
+    terms: Iterable[Stanza],
+    file: Union[None, str, TextIO] = None,
+) -> None:
+    """Convert the terms from :func:`iter_obo_terms` to a BELANNO file, like :func:`convert_obo_graph_to_belanno`.
+
+    The terms need their ``name`` and ``description`` tags.
+    """
+    _export(
+        header['ontology'],
+        header.get('data-version'),
+        ((term['id'], term) for term in terms),
+        annotation_file=file,
+        include_annotation=True,
+    )
 
 
 def convert_obo_graph_to_belanno(
-    graph: nx.MultiDiGraph,
+    graph: 'nx.MultiDiGraph',
     file: Optional[TextIO] = None,
 ) -> None:
     """Convert an OBO graph to a BEL annotation."""
+    from tqdm import tqdm
+
     keyword = graph.graph['name']
     ontology = graph.graph['ontology']
 
@@ -120,6 +278,195 @@ def convert_obo_graph_to_belanno(
     )
 
 
+def convert_obo_to_bel_resources(
+    url: str,
+    names_path: Optional[str] = None,
+    identifiers_path: Optional[str] = None,
+    annotation_path: Optional[str] = None,
+    encoding: Union[None, str, EncodingFunction] = None,
+    process_identifiers: Optional[Callable[[str], str]] = None,
+) -> None:
+    """Convert an OBO file to a namespace of names, a namespace of identifiers, and an annotation in one pass.
+
+    Each term is filtered and encoded once, then given to each of the outputs. The file is streamed with
+    :func:`iter_obo_terms` unless the encoding is a function, which needs the graph from :mod:`obonet`.
+
+    :param url: The URL or file path to an OBO file
+    :param names_path: If given, the path to write a BELNS file of the names of the terms to
+    :param identifiers_path: If given, the path to write a BELNS file of the identifiers of the terms to
+    :param annotation_path: If given, the path to write a BELANNO file of the names of the terms to
+    :param encoding: The encoding of the terms in the namespaces, or a function of the graph and a node
+    :param process_identifiers: A function to apply to the identifiers in the namespace of identifiers
+    """
+    if callable(encoding):
+        import obonet
+        convert_obo_graph_to_bel_resources(
+            obonet.read_obo(url),
+            names_file=names_path,
+            identifiers_file=identifiers_path,
+            annotation_file=annotation_path,
+            encoding=encoding,
+            process_identifiers=process_identifiers,
+        )
+        return
+
+    tags = DEFAULT_TERM_TAGS | {'description'} if annotation_path is not None else DEFAULT_TERM_TAGS
+    header, terms = iter_obo_terms(iter_lines(url), tags=tags)
+    _export(
+        header['ontology'],
+        header['data-version'],
+        ((term['id'], term) for term in terms),
+        encode=_constant_encoder(encoding),
+        names_file=names_path,
+        identifiers_file=identifiers_path,
+        annotation_file=annotation_path,
+        process_identifiers=process_identifiers,
+        include_names=names_path is not None,
+        include_identifiers=identifiers_path is not None,
+        include_annotation=annotation_path is not None,
+    )
+
+
+def convert_obo_graph_to_bel_resources(
+    graph: 'nx.MultiDiGraph',
+    names_file: Union[None, str, TextIO] = None,
+    identifiers_file: Union[None, str, TextIO] = None,
+    annotation_file: Union[None, str, TextIO] = None,
+    encoding: Union[None, str, EncodingFunction] = None,
+    process_identifiers: Optional[Callable[[str], str]] = None,
+) -> None:
+    """Convert a graph from :mod:`obonet` to several BEL resources in one pass over its nodes.
+
+    This gives the same files as :func:`convert_obo_graph_to_belns` with and without ``use_names`` and
+    :func:`convert_obo_graph_to_belanno`, but each node is filtered and encoded once.
+
+    :param graph: A graph from :mod:`obonet`
+    :param names_file: If given, the file or path to write a BELNS file of the names of the nodes to
+    :param identifiers_file: If given, the file or path to write a BELNS file of the identifiers of the nodes to
+    :param annotation_file: If given, the file or path to write a BELANNO file of the names of the nodes to
+    :param encoding: The encoding of the nodes in the namespaces, or a function of the graph and a node
+    :param process_identifiers: A function to apply to the identifiers in the namespace of identifiers
+    """
+    encode = _graph_encoder(graph, encoding) if callable(encoding) else _constant_encoder(encoding)
+
+    _export(
+        graph.graph['name'],
+        graph.graph['data-version'],
+        graph.nodes(data=True),
+        encode=encode,
+        names_file=names_file,
+        identifiers_file=identifiers_file,
+        annotation_file=annotation_file,
+        process_identifiers=process_identifiers,
+        include_names=names_file is not None,
+        include_identifiers=identifiers_file is not None,
+        include_annotation=annotation_file is not None,
+    )
+
+
+def _constant_encoder(encoding: Optional[str]) -> Callable[[str], str]:
+    encoding = encoding or ''
+
+    def encode(_: str) -> str:
+        """Encode a term."""
+        return encoding
+
+    return encode
+
+
+def _graph_encoder(graph: 'nx.MultiDiGraph', encoding: EncodingFunction) -> Callable[[str], str]:
+    def encode(node: str) -> str:
+        """Encode a node with the graph."""
+        return encoding(graph, node)
+
+    return encode
+
+
+def _export(
+    ontology: str,
+    version: Optional[str],
+    entries: Iterable[Tuple[str, Mapping]],
+    encode: Callable[[str], str] = _constant_encoder(None),
+    names_file: Union[None, str, TextIO] = None,
+    identifiers_file: Union[None, str, TextIO] = None,
+    annotation_file: Union[None, str, TextIO] = None,
+    process_identifiers: Optional[Callable[[str], str]] = None,
+    include_names: bool = False,
+    include_identifiers: bool = False,
+    include_annotation: bool = False,
+) -> None:
+    """Filter and encode the terms of an ontology once, then write each of the requested resources."""
+    names, identifiers, annotations = _collect_values(
+        _iter_ontology_entries(ontology, entries),
+        encode=encode,
+        process_identifiers=process_identifiers or str,
+        include_names=include_names,
+        include_identifiers=include_identifiers,
+        include_annotation=include_annotation,
+    )
+
+    namespaces = [
+        (include_names, names, names_file),
+        (include_identifiers, identifiers, identifiers_file),
+    ]
+    if any(include and not values for include, values, _ in namespaces):
+        raise ValueError('No values for {} found'.format(ontology))
+
+    for include, values, file in namespaces:
+        if include:
+            write_namespace(
+                values=values,
+                namespace_name=_get_namespace_name(ontology),
+                namespace_keyword=ontology,
+                namespace_domain=None,
+                namespace_version=version,
+                file=file,
+            )
+
+    if include_annotation:
+        write_annotation(
+            values=annotations,
+            file=annotation_file,
+            citation_name=ontology,
+            description=ontology,
+            keyword=ontology,
+        )
+
+
+def _collect_values(
+    entries: Iterable[Tuple[str, Mapping]],
+    encode: Callable[[str], str],
+    process_identifiers: Callable[[str], str],
+    include_names: bool,
+    include_identifiers: bool,
+    include_annotation: bool,
+) -> Tuple[Dict[str, str], Dict[str, str], List[Tuple[str, str]]]:
+    """Get the values of the namespace of names, the namespace of identifiers, and the annotation in one pass."""
+    names = {}  # type: Dict[str, str]
+    identifiers = {}  # type: Dict[str, str]
+    annotations = []  # type: List[Tuple[str, str]]
+
+    for identifier, data in entries:
+        if include_names or include_identifiers:
+            value = encode(identifier)
+            if include_names:
+                names[data['name']] = value
+            if include_identifiers:
+                identifiers[process_identifiers(identifier)] = value
+        if include_annotation:
+            annotations.append((data['name'], data.get('description', '')))
+
+    return names, identifiers, annotations
+
+
+def _iter_ontology_entries(ontology: str, entries: Iterable[Tuple[str, Mapping]]) -> Iterable[Tuple[str, Mapping]]:
+    """Keep the entries whose identifiers are prefixed by the ontology, ignoring case."""
+    prefix = ontology.upper() + ':'
+    for identifier, data in entries:
+        if identifier.upper().startswith(prefix):
+            yield identifier, data
+
+
 if __name__ == '__main__':
     convert_obo_to_belns(
         url='http://purl.obolibrary.org/obo/doid.obo',
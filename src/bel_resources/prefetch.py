@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for getting the resources defined in a BEL Script while its statements are being read."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+
+from .constants import DEFINITION_URL_RE
+from .read_document import EnumLine
+from .read_utils import get_bel_resource, get_bel_resource_or_error
+
+__all__ = [
+    'ResourcePrefetcher',
+    'get_definition_urls',
+]
+
+log = logging.getLogger(__name__)
+
+
+def get_definition_urls(definitions: Iterable[EnumLine]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Get the URLs of the namespaces and annotations defined in a BEL Script.
+
+    :param definitions: The definitions from :func:`bel_resources.split_file_to_annotations_and_definitions`
+    :return: A pair of dictionaries of the keywords of the namespaces and annotations to their URLs
+    """
+    namespaces, annotations = {}, {}  # type: Dict[str, str], Dict[str, str]
+    for _, line in definitions:
+        match = DEFINITION_URL_RE.match(line)
+        if match is None:
+            continue
+        kind, keyword, url = match.groups()
+        urls = namespaces if kind == 'NAMESPACE' else annotations
+        urls[keyword.strip('"')] = url
+    return namespaces, annotations
+
+
+class ResourcePrefetcher:
+    """Get the resources defined in a BEL Script in the background.
+
+    The resources are downloaded and parsed in a thread pool as soon as the prefetcher is made, so it
+    overlaps with reading the statements of the document. Asking for a resource only waits if it hasn't
+    been gotten yet.
+
+    >>> from bel_resources import split_file_lazily
+    >>> metadata, definitions, statements = split_file_lazily(lines)
+    >>> with ResourcePrefetcher(definitions) as prefetcher:
+    ...     for line_number, line in statements:
+    ...         ...
+    ...     hgnc = prefetcher.get_namespace('HGNC')
+    """
+
+    def __init__(self,
+                 definitions: Iterable[EnumLine],
+                 max_workers: Optional[int] = None,
+                 cache=None,
+                 session: Optional[requests.Session] = None,
+                 ) -> None:
+        """Start getting the resources.
+
+        :param definitions: The definitions from :func:`bel_resources.split_file_to_annotations_and_definitions`
+        :param max_workers: The number of resources to get at the same time. Defaults to the number of unique
+         locations, up to 32.
+        :param cache: An optional :class:`bel_resources.cache.ResourceCache` to load the resources through
+        :param session: The session to download with. Defaults to the one from :func:`bel_resources.utils.get_session`.
+        """
+        self.cache = cache
+        self.session = session
+
+        namespaces, annotations = get_definition_urls(definitions)
+        #: The keywords of the namespaces defined by URL and their URLs
+        self.namespaces = namespaces
+        #: The keywords of the annotations defined by URL and their URLs
+        self.annotations = annotations
+
+        locations = list(dict.fromkeys(list(self.namespaces.values()) + list(self.annotations.values())))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max(1, min(32, len(locations))))
+        self._futures = {
+            location: self._executor.submit(get_bel_resource_or_error, location, cache=cache, session=session)
+            for location in locations
+        }
+        log.debug('prefetching %d resources', len(locations))
+
+    def get_bel_resource(self, location: str) -> Dict:
+        """Get a resource, waiting for it if it's being prefetched or getting it now if it wasn't defined.
+
+        :param location: The URL or file path to a BELNS, BELANNO, or BELEQ file
+        :return: A config-style dictionary representing the BEL config file
+        :raises: ResourceError
+        """
+        future = self._futures.get(location)
+        if future is None:
+            return get_bel_resource(location, cache=self.cache, session=self.session)
+
+        result = future.result()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_namespace(self, keyword: str) -> Dict:
+        """Get the namespace defined with the given keyword.
+
+        :raises: KeyError if no namespace is defined with the keyword by URL
+        :raises: ResourceError
+        """
+        return self.get_bel_resource(self.namespaces[keyword])
+
+    def get_annotation(self, keyword: str) -> Dict:
+        """Get the annotation defined with the given keyword.
+
+        :raises: KeyError if no annotation is defined with the keyword by URL
+        :raises: ResourceError
+        """
+        return self.get_bel_resource(self.annotations[keyword])
+
+    def close(self) -> None:
+        """Cancel the resources that haven't started being gotten and wait for the rest."""
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'ResourcePrefetcher':  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
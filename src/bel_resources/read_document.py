@@ -2,30 +2,95 @@
 
 """Utilities for reading BEL Script."""
 
+import hashlib
 import logging
-from typing import Iterable, Iterator, Tuple
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from multisplitby import multi_split_by
 
 from .constants import METADATA_LINE_RE
+from .exc import UnfinishedLineError
 
 __all__ = [
     'split_file_to_annotations_and_definitions',
+    'split_file_lazily',
+    'IncrementalSplit',
+    'IncrementalSplitter',
+    'sanitize_file_lines_fast',
+    'sanitize_file_lines_parallel',
 ]
 
 log = logging.getLogger(__name__)
 
 EnumLine = Tuple[int, str]
 EnumLines = Iterable[EnumLine]
+#: The line number of the first line of a chunk of lines and the lines
+Chunk = Tuple[int, List[str]]
+#: The results of sanitizing blocks of lines with :func:`_sanitize_chunk`, by the hash of their contents
+SanitizedBlocks = Dict[bytes, Tuple[List[EnumLine], Optional[int]]]
 
+#: The default number of physical lines in each chunk sanitized by :func:`sanitize_file_lines_parallel`
+DEFAULT_CHUNK_SIZE = 100000
 
-def split_file_to_annotations_and_definitions(lines: Iterable[str]) -> Tuple[EnumLines, EnumLines, EnumLines]:
-    """Enumerate a line iterable and splits into 3 parts."""
-    enum_lines = sanitize_file_lines(lines)
+
+def split_file_to_annotations_and_definitions(lines: Iterable[str],
+                                              processes: Optional[int] = None,
+                                              ) -> Tuple[EnumLines, EnumLines, EnumLines]:
+    """Enumerate a line iterable and splits into 3 parts.
+
+    :param lines: An iterable over the lines in a BEL Script
+    :param processes: If given, the lines are sanitized with :func:`sanitize_file_lines_parallel` in a pool
+     of this many processes
+    """
+    if processes is None:
+        enum_lines = sanitize_file_lines_fast(lines)
+    else:
+        enum_lines = sanitize_file_lines_parallel(lines, max_workers=processes)
     metadata, definitions, statements = multi_split_by(enum_lines, [_predicate_1, _predicate_2])
     return metadata, definitions, statements
 
 
+def split_file_lazily(lines: Iterable[str],
+                      processes: Optional[int] = None,
+                      ) -> Tuple[List[EnumLine], List[EnumLine], Iterator[EnumLine]]:
+    """Split the lines of a BEL Script like :func:`split_file_to_annotations_and_definitions` in a single pass.
+
+    The metadata and definitions are read eagerly since they are small, then the statements are returned as
+    an iterator that reads the rest of the lines as it is consumed, so they are never buffered.
+
+    :param lines: An iterable over the lines in a BEL Script
+    :param processes: If given, the lines are sanitized with :func:`sanitize_file_lines_parallel` in a pool
+     of this many processes
+    :return: A list of the metadata lines, a list of the definition lines, and an iterator over the statements
+    """
+    if processes is None:
+        enum_lines = iter(sanitize_file_lines_fast(lines))
+    else:
+        enum_lines = iter(sanitize_file_lines_parallel(lines, max_workers=processes))
+
+    metadata = []
+    for line in enum_lines:
+        if _predicate_1(line):
+            # the line that ends the metadata always goes with the definitions
+            definitions = [line]
+            break
+        metadata.append(line)
+    else:
+        return metadata, [], iter(())
+
+    for line in enum_lines:
+        if _predicate_2(line):
+            return metadata, definitions, chain((line,), enum_lines)
+        definitions.append(line)
+
+    return metadata, definitions, iter(())
+
+
 def _predicate_1(line: EnumLine) -> bool:
     return not line[1].startswith('SET DOCUMENT')
 
@@ -69,6 +134,97 @@ def sanitize_file_lines(lines: Iterable[str]) -> EnumLines:
         yield line_number, line
 
 
+def sanitize_file_lines_fast(lines: Iterable[str], note_char: str = ':') -> EnumLines:
+    """Enumerate a line iterator and return the same pairs of (line number, line) as :func:`sanitize_file_lines`.
+
+    This does the work of :func:`sanitize_file_lines` and :func:`sanitize_file_line_iter` in a single loop
+    with explicit state for the line being continued, and only formats trace logging messages when their
+    levels are enabled.
+
+    :param lines: An iterable over the lines in a BEL Script
+    :param note_char: The character sequence denoting a special note
+    :raises: UnfinishedLineError if the lines end in the middle of a logical line, like the
+     :class:`RuntimeError` from :func:`sanitize_file_lines`
+    """
+    log_continuations = log.isEnabledFor(4)
+    log_extensions = log.isEnabledFor(3)
+    note = '#' + note_char
+
+    # 0 if not continuing a line, 1 if continuing after a backslash, 2 if continuing an unbalanced quote
+    mode = 0
+    start = 0
+    continued = ''
+
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        if line[0] == '#':
+            _log_note(line, line_number, note)
+            continue
+
+        if mode == 0:
+            if line[-1] == '\\' or 1 == line.count('"'):
+                mode, continued = _start_continued_line(line, line_number, log_continuations)
+                start = line_number
+                continue
+        else:
+            mode, line = _continue_line(mode, continued, line, log_extensions)
+            if mode != 0:
+                continued = line
+                continue
+            line_number = start
+
+        comment_loc = line.rfind(' //')
+        if 0 <= comment_loc:
+            line = line[:comment_loc]
+
+        yield line_number, line
+
+    if mode != 0:
+        raise UnfinishedLineError(start)
+
+
+def _log_note(line: str, line_number: int, note: str) -> None:
+    if line.startswith(note):
+        log.info('NOTE: Line %d: %s', line_number, line)
+
+
+def _start_continued_line(line: str, line_number: int, log_continuations: bool) -> Tuple[int, str]:
+    """Get the mode and the text of a logical line that starts with a backslash or an unbalanced quote."""
+    if line[-1] == '\\':
+        if log_continuations:
+            log.log(4, 'Multiline quote starting on line: %d', line_number)
+        return 1, line.strip('\\').strip()
+
+    if log_continuations:
+        log.log(4, 'PyBEL013 Missing new line escapes [line: %d]', line_number)
+    return 2, line
+
+
+def _continue_line(mode: int, continued: str, line: str, log_extensions: bool) -> Tuple[int, str]:
+    """Add a line to the logical line being continued.
+
+    :return: The mode after the line and the text of the logical line, which is finished if the mode is 0
+    """
+    if mode == 1 and line[-1] == '\\':
+        if log_extensions:
+            log.log(3, 'Extending line: %s', line)
+        return 1, continued + ' ' + line.strip('\\').strip()
+
+    if mode == 2 and line[-1] != '"':
+        if log_extensions:
+            log.log(3, 'Extending line: %s', line)
+        return 2, continued.strip() + ' ' + line
+
+    line = continued + ' ' + line
+    if log_extensions:
+        log.log(3, 'Final line: %s', line)
+    return 0, line
+
+
 def sanitize_file_line_iter(file: Iterable[str], note_char: str = ':') -> Iterator[EnumLine]:
     """Clean a line iterator by removing extra whitespace, blank lines, comment lines, and log nodes.
 
@@ -88,3 +244,268 @@ def sanitize_file_line_iter(file: Iterable[str], note_char: str = ':') -> Iterat
             continue
 
         yield line_number, line
+
+
+def sanitize_file_lines_parallel(lines: Iterable[str],
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                 max_workers: Optional[int] = None,
+                                 ) -> EnumLines:
+    r"""Sanitize the lines of a BEL Script in a process pool, giving the same results as :func:`sanitize_file_lines`.
+
+    The lines are cut into chunks, extended so they don't end on a ``\`` continuation, and each chunk is
+    sanitized as if it started a new logical line. Since an unbalanced quote can span any number of lines,
+    a chunk might still end in the middle of a logical line. In that case, the start of the next chunk is
+    sanitized again in order, continuing from that logical line, until it reaches a line where the chunk's
+    own results start a logical line too. Both agree from there on, so the rest of its results are kept.
+
+    :param lines: An iterable over the lines in a BEL Script
+    :param chunk_size: The minimum number of physical lines in each chunk
+    :param max_workers: The number of processes. Defaults to the number of processors.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        window = 2 * max_workers
+        yield from _merge_sanitized_chunks(_iter_sanitized_chunks(executor, lines, chunk_size, window))
+
+
+def _iter_sanitized_chunks(executor, lines: Iterable[str], chunk_size: int, window: int):
+    """Submit chunks to the executor, keeping a bounded number of them in flight, and yield results in order."""
+    pending = deque()  # type: deque
+    for chunk in _iter_chunks(lines, chunk_size):
+        pending.append((chunk, executor.submit(_sanitize_chunk, chunk)))
+        if window <= len(pending):
+            chunk, future = pending.popleft()
+            yield chunk + future.result()
+
+    for chunk, future in pending:
+        yield chunk + future.result()
+
+
+def _iter_chunks(lines: Iterable[str], chunk_size: int) -> Iterable[Chunk]:
+    """Cut lines into chunks of pairs of the line number of their first line and the lines."""
+    lines = iter(lines)
+    start = 1
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+
+        while chunk[-1].rstrip().endswith('\\'):
+            line = next(lines, None)
+            if line is None:
+                break
+            chunk.append(line)
+
+        yield start, chunk
+        start += len(chunk)
+
+
+def _sanitize_chunk(chunk: Chunk) -> Tuple[List[EnumLine], Optional[int]]:
+    """Sanitize a chunk of lines as if it started a new logical line.
+
+    :returns: A pair of the sanitized lines and, if the chunk ends in the middle of a logical line, the
+     index of the first line in the chunk that wasn't used
+    """
+    results = []  # type: List[EnumLine]
+    for line, end in _iter_sanitize_chunk(*chunk):
+        if line is None:
+            return results, end
+        results.append(line)
+    return results, None
+
+
+def _iter_sanitize_chunk(start: int, lines: List[str]) -> Iterable[Tuple[Optional[EnumLine], int]]:
+    """Sanitize lines starting at the given line number, yielding the index after the end of each logical line.
+
+    If the lines end in the middle of a logical line, finishes by yielding ``(None, end)`` where ``end``
+    is the index after the end of the last complete logical line.
+    """
+    position = end = 0
+
+    def _iter_counted_lines():
+        nonlocal position
+        for line in lines:
+            position += 1
+            yield line
+
+    try:
+        for line_number, line in sanitize_file_lines_fast(_iter_counted_lines()):
+            end = position
+            yield (line_number + start - 1, line), end
+    except UnfinishedLineError:
+        yield None, end
+
+
+def _merge_sanitized_chunks(chunks: Iterable[Tuple[int, List[str], List[EnumLine], Optional[int]]]) -> EnumLines:
+    """Merge chunks sanitized as if they each started a new logical line into the lines sanitized in order.
+
+    :param chunks: An iterable of the line number of the first line in each chunk, its lines, and the results
+     of :func:`_sanitize_chunk` on it
+    """
+    carry = None  # type: Optional[Chunk]
+
+    for start, lines, results, unused in chunks:
+        if carry is not None:
+            carry, results, unused = yield from _iter_resumed_chunk(carry, lines, results, unused)
+            if carry is not None:
+                continue
+
+        yield from results
+        carry = None if unused is None else (start + unused, lines[unused:])
+
+    if carry is not None:
+        # sanitizing the rest raises the same error as sanitize_file_lines at the end of the lines
+        for line_number, line in sanitize_file_lines_fast(carry[1]):
+            yield line_number + carry[0] - 1, line
+
+
+def _iter_resumed_chunk(carry: Chunk, lines: List[str], results: List[EnumLine], unused: Optional[int]):
+    """Sanitize the lines carried over from the previous chunk and the lines of this one in order.
+
+    This stops when a logical line starts on the same line as one of the chunk's own results.
+
+    :return: The lines to carry over to the next chunk if this one also ends in the middle of a logical line,
+     and the results of the chunk and the index of its first unused line that are left to merge
+    """
+    carry_start, combined = carry[0], carry[1] + lines
+    result_indexes = {line_number: index for index, (line_number, _) in enumerate(results)}
+
+    for line, end in _iter_sanitize_chunk(carry_start, combined):
+        if line is None:
+            return (carry_start + end, combined[end:]), [], None
+        if line[0] in result_indexes:
+            return None, results[result_indexes[line[0]]:], unused
+        yield line
+
+    return None, [], None
+
+
+#: The result of :meth:`IncrementalSplitter.split`. ``added`` has the line numbers of the statements in
+#: changed regions of the new document and ``removed`` has the line numbers of the statements in the
+#: changed regions of the previous document, so everything else is the same statement, possibly moved.
+IncrementalSplit = NamedTuple('IncrementalSplit', [
+    ('metadata', List[EnumLine]),
+    ('definitions', List[EnumLine]),
+    ('statements', List[EnumLine]),
+    ('added', List[int]),
+    ('removed', List[int]),
+])
+
+
+class IncrementalSplitter:
+    """Split successive versions of a BEL Script, only sanitizing the regions that changed since the last one.
+
+    The lines are cut into blocks ending with blank lines, which are identified by the hash of their contents.
+    The sanitized lines of each block are kept relative to the start of the block, so blocks that didn't
+    change, even if they moved because lines were added or removed above them, are reused without being
+    sanitized again. The blocks are merged like in :func:`sanitize_file_lines_parallel`, so the results are
+    the same as :func:`split_file_to_annotations_and_definitions`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the splitter with no previous document."""
+        #: The number of blocks reused by the last split
+        self.hits = 0
+        #: The number of blocks sanitized by the last split
+        self.misses = 0
+
+        self._blocks = []  # type: List[Tuple[bytes, int, int]]
+        self._results = {}  # type: SanitizedBlocks
+        self._statements = []  # type: List[EnumLine]
+
+    def split(self, lines: Iterable[str]) -> IncrementalSplit:
+        """Split the new version of the document and compare its statements to the previous version.
+
+        :param lines: An iterable over the lines in a BEL Script
+        :raises: UnfinishedLineError if the lines end in the middle of a logical line
+        """
+        self.hits = self.misses = 0
+        blocks = []
+        results = {}  # type: SanitizedBlocks
+        chunks = []
+
+        for start, block in _iter_blocks(lines):
+            digest = hashlib.sha1('\n'.join(block).encode('utf-8')).digest()
+            blocks.append((digest, start, len(block)))
+
+            result = results.get(digest) or self._results.get(digest)
+            if result is None:
+                self.misses += 1
+                result = _sanitize_chunk((1, block))
+            else:
+                self.hits += 1
+            results[digest] = result
+
+            block_results, unused = result
+            block_results = [(line_number + start - 1, line) for line_number, line in block_results]
+            chunks.append((start, block, block_results, unused))
+
+        log.debug('sanitized %d blocks and reused %d', self.misses, self.hits)
+        enum_lines = list(_merge_sanitized_chunks(chunks))
+        metadata, definitions, statements = (
+            list(part)
+            for part in multi_split_by(enum_lines, [_predicate_1, _predicate_2])
+        )
+
+        removed_ranges, added_ranges = _get_changed_ranges(self._blocks, blocks)
+        removed = _select_line_numbers(self._statements, removed_ranges)
+        added = _select_line_numbers(statements, added_ranges)
+
+        self._blocks = blocks
+        self._results = results
+        self._statements = statements
+
+        return IncrementalSplit(metadata, definitions, statements, added, removed)
+
+
+def _iter_blocks(lines: Iterable[str]) -> Iterable[Tuple[int, List[str]]]:
+    """Cut lines into blocks of pairs of the line number of their first line and the lines, ending on blank lines."""
+    start = 1
+    block = []
+    has_content = False
+    for line in lines:
+        block.append(line)
+        if line.strip():
+            has_content = True
+        elif has_content:
+            yield start, block
+            start += len(block)
+            block = []
+            has_content = False
+
+    if block:
+        yield start, block
+
+
+def _get_changed_ranges(old_blocks, new_blocks) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    """Get the ranges of line numbers of the blocks that differ in the old and new documents."""
+    matcher = SequenceMatcher(
+        None,
+        [digest for digest, _, _ in old_blocks],
+        [digest for digest, _, _ in new_blocks],
+        autojunk=False,
+    )
+    old_ranges, new_ranges = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if i1 < i2:
+            old_ranges.append((old_blocks[i1][1], old_blocks[i2 - 1][1] + old_blocks[i2 - 1][2]))
+        if j1 < j2:
+            new_ranges.append((new_blocks[j1][1], new_blocks[j2 - 1][1] + new_blocks[j2 - 1][2]))
+    return old_ranges, new_ranges
+
+
+def _select_line_numbers(enum_lines: List[EnumLine], ranges: List[Tuple[int, int]]) -> List[int]:
+    """Get the line numbers that fall in the given sorted ranges, which are half-open."""
+    rv = []  # type: List[int]
+    remaining = iter(ranges)
+    current = next(remaining, None)
+    for line_number, _ in enum_lines:
+        while current is not None and current[1] <= line_number:
+            current = next(remaining, None)
+        if current is None:
+            break
+        if current[0] <= line_number:
+            rv.append(line_number)
+    return rv
@@ -3,40 +3,104 @@
 """Shared utilities for reading BEL namespace and annotation files."""
 
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from configparser import ConfigParser
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import requests.exceptions
 
-from .exc import EmptyResourceError, InvalidResourceError, MissingResourceError
-from .utils import download, is_url
+from .exc import EmptyResourceError, InvalidResourceError, MissingResourceError, ResourceError
+from .utils import download, is_url, iter_decompressed, open_resource
 
 __all__ = [
     'parse_bel_resource',
+    'iter_bel_resource',
     'get_lines',
+    'iter_lines',
     'get_bel_resource',
+    'get_bel_resources',
+    'load_bel_resource',
 ]
 
 log = logging.getLogger(__name__)
 
+#: The number of bytes read at a time from a streamed download
+DEFAULT_CHUNK_SIZE = 1 << 20
 
-def get_bel_resource(location: str) -> Dict:
+
+def get_bel_resource(location: str, cache=None, session: Optional[requests.Session] = None) -> Dict:
     """Load, download, and parse a config file from the given url or file path.
 
     :param location: The URL or file path to a BELNS, BELANNO, or BELEQ file to download and parse
+    :param cache: An optional :class:`bel_resources.cache.ResourceCache` to load the resource through
+    :param session: The session to download with, also on a cache miss. Defaults to the cache's session or the
+     one from :func:`bel_resources.utils.get_session`.
     :return: A config-style dictionary representing the BEL config file
     :raises: ResourceError
     """
-    log.debug('getting resource: %s', location)
+    if cache is not None:
+        return cache.get_bel_resource(location, session=session)
 
+    log.debug('getting resource: %s', location)
+    return load_bel_resource(location, iter_lines(location, session=session))
+
+
+def get_bel_resources(locations: Iterable[str],
+                      max_workers: Optional[int] = None,
+                      cache=None,
+                      session: Optional[requests.Session] = None,
+                      ) -> Iterable[Tuple[str, Union[Dict, ResourceError]]]:
+    """Load, download, and parse several config files concurrently.
+
+    :param locations: The URLs or file paths to BELNS, BELANNO, or BELEQ files to download and parse
+    :param max_workers: The number of resources to get at the same time. Defaults to the number of unique locations,
+     up to 32.
+    :param cache: An optional :class:`bel_resources.cache.ResourceCache` to load the resources through
+    :param session: The session to download with. Defaults to the one from :func:`bel_resources.utils.get_session`.
+    :return: An iterator over pairs of each location and either its config-style dictionary or the
+     :class:`bel_resources.ResourceError` that was raised when getting it, in the order they complete
+    """
+    locations = list(dict.fromkeys(locations))
+    if not locations:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, len(locations))) as executor:
+        futures = {
+            executor.submit(get_bel_resource_or_error, location, cache=cache, session=session): location
+            for location in locations
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def get_bel_resource_or_error(location: str,
+                              cache=None,
+                              session: Optional[requests.Session] = None,
+                              ) -> Union[Dict, ResourceError]:
+    """Get a resource with :func:`get_bel_resource`, or return the error if it can't be gotten."""
     try:
-        lines = get_lines(location)
-    except requests.exceptions.HTTPError as e:
-        raise MissingResourceError(location) from e
+        return get_bel_resource(location, cache=cache, session=session)
+    except ResourceError as e:
+        return e
+    except (requests.exceptions.RequestException, OSError) as e:
+        log.warning('could not get resource %s: %s', location, e)
+        error = MissingResourceError(location)
+        error.__cause__ = e
+        return error
+
 
+def load_bel_resource(location: str, lines: Iterable[str]) -> Dict:
+    """Parse the lines of a BEL config file, raising the appropriate errors for the given location.
+
+    :param location: The URL or file path the lines came from
+    :param lines: An iterable over the lines in a BEL config file
+    :return: A config-style dictionary representing the BEL config file
+    :raises: ResourceError
+    """
     try:
         result = parse_bel_resource(lines)
+    except requests.exceptions.HTTPError as e:
+        raise MissingResourceError(location) from e
     except ValueError as e:
         raise InvalidResourceError(location) from e
 
@@ -52,32 +116,54 @@ def parse_bel_resource(lines: Iterable[str]) -> Dict:
     :param lines: An iterable over the lines in a BEL config file
     :return: A config-style dictionary representing the BEL config file
     """
-    lines = list(lines)
+    header, values = iter_bel_resource(lines)
+
+    res = dict(header)  # type: Dict[str, Dict]
+    res['Values'] = dict(values)
+
+    return res
 
-    value_line = 1 + max(
-        index
-        for index, line in enumerate(lines)
-        if '[Values]' == line.strip()
-    )
+
+def iter_bel_resource(lines: Iterable[str]) -> Tuple[Dict[str, Dict[str, str]], Iterator[Tuple[str, Optional[str]]]]:
+    """Parse the header of a BEL config file then lazily iterate over its values in a single pass.
+
+    The header sections are read eagerly, up to the ``[Values]`` line. The returned iterator continues
+    from the same position in ``lines``, so the values are never held in memory unless the caller does so.
+
+    :param lines: An iterable over the lines in a BEL config file
+    :return: A pair of a config-style dictionary representing the header sections and an iterator over
+     pairs of names and their encodings from the ``[Values]`` section
+    :raises: ValueError if there is no ``[Values]`` section
+    """
+    lines = iter(lines)
+
+    header_lines = []
+    for line in lines:
+        header_lines.append(line)
+        if '[Values]' == line.strip():
+            break
+    else:
+        raise ValueError('missing [Values] section')
 
     metadata_config = ConfigParser(strict=False)
     metadata_config.optionxform = lambda option: option
-    metadata_config.read_file(lines[:value_line])
+    metadata_config.read_file(header_lines)
+
+    header = {
+        key: dict(values)
+        for key, values in metadata_config.items()
+    }
+    header.pop('Values', None)
 
     delimiter = metadata_config['Processing']['DelimiterString']
 
-    value_dict = dict(
+    values = (
         _get_bel_resource_kvp(line, delimiter)
-        for line in lines[value_line:]
+        for line in lines
+        if line.strip()
     )
 
-    res = {
-        key: dict(values)
-        for key, values in metadata_config.items()
-    }
-    res['Values'] = value_dict
-
-    return res
+    return header, values
 
 
 def _get_bel_resource_kvp(line: str, delimiter: str) -> Tuple[str, str]:
@@ -88,15 +174,68 @@ def _get_bel_resource_kvp(line: str, delimiter: str) -> Tuple[str, str]:
     return key, value
 
 
-def get_lines(location: str) -> List[str]:
+def get_lines(location: str, session: Optional[requests.Session] = None) -> List[str]:
     """Get the lines from a location.
 
     :param location: The URL location to download or a file path to open. File path expands user.
+    :param session: The session to download with. Defaults to the one from :func:`bel_resources.utils.get_session`.
+    :raises: requests.exceptions.HTTPError
+    """
+    return list(iter_lines(location, session=session))
+
+
+def iter_lines(location: str, session: Optional[requests.Session] = None) -> Iterable[str]:
+    """Iterate over the lines from a location.
+
+    Files compressed with gzip, bz2, or xz are decompressed on the fly. Downloads are recognized by
+    their contents and file paths by their ``.gz``, ``.bz2``, or ``.xz`` extension.
+
+    :param location: The URL location to download or a file path to open. File path expands user.
+    :param session: The session to download with. Defaults to the one from :func:`bel_resources.utils.get_session`.
     :raises: requests.exceptions.HTTPError
     """
     if is_url(location):
-        res = download(location)
-        return list(line.decode('utf-8', errors='ignore').strip() for line in res.iter_lines())
+        yield from iter_response_lines(download(location, session=session, stream=True))
+        return
+
+    with open_resource(location) as f:
+        yield from f
+
+
+def iter_response_lines(res: requests.Response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterable[str]:
+    """Iterate over the decoded and stripped lines in a response, decompressing it if needed, then close it.
+
+    :param res: A response, preferably from a streamed request so it's never fully held in memory
+    :param chunk_size: The number of bytes to read at a time
+    """
+    try:
+        yield from iter_chunk_lines(iter_decompressed(res.iter_content(chunk_size=chunk_size)))
+    finally:
+        res.close()
+
+
+def iter_chunk_lines(chunks: Iterable[bytes]) -> Iterable[str]:
+    """Split chunks of UTF-8 encoded bytes into decoded and stripped lines.
+
+    Each chunk is decoded once, up to its last newline, and the incomplete line after it is
+    carried over to the next chunk. Since the split happens on a newline byte, it never falls
+    inside a multi-byte character.
+
+    :param chunks: An iterable of chunks of bytes
+    """
+    remainder = b''
+
+    for chunk in chunks:
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            remainder += chunk
+            continue
+
+        text = (remainder + chunk[:end]).decode('utf-8', errors='ignore')
+        remainder = chunk[end + 1:]
+
+        for line in text.split('\n'):
+            yield line.strip()
 
-    with open(os.path.expanduser(location)) as f:
-        return list(f)
+    if remainder:
+        yield remainder.decode('utf-8', errors='ignore').strip()
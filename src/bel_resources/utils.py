@@ -2,18 +2,58 @@
 
 """Utilities for reading and writing BEL script, namespace files, and annotation files."""
 
+import bz2
+import gzip
+import itertools
+import lzma
+import os
+import threading
 import time
+import zlib
+from typing import Any, Callable, IO, Iterable, Mapping, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests_file import FileAdapter
+from urllib3.util.retry import Retry
 
 __all__ = [
     'get_iso_8601_date',
     'is_url',
     'download',
+    'make_session',
+    'get_session',
+    'set_session',
+    'open_resource',
+    'iter_decompressed',
 ]
 
+#: The default (connect, read) timeout in seconds for requests made through :func:`make_session`
+DEFAULT_TIMEOUT = (10, 60)
+
+Timeout = Union[None, float, Tuple[float, float]]
+Opener = Callable[..., IO]
+MakeDecompressor = Callable[[], Any]
+
+_session = None  # type: Optional[requests.Session]
+_session_lock = threading.Lock()
+
+#: Functions for opening files, by the extensions of the compression formats they read and write
+COMPRESSED_OPENERS = {  # type: Mapping[str, Opener]
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+#: Functions for making incremental decompressors, by the magic bytes of the formats they read
+_DECOMPRESSORS = [  # type: Iterable[Tuple[bytes, MakeDecompressor]]
+    (b'\x1f\x8b', lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)),
+    (b'BZh', bz2.BZ2Decompressor),
+    (b'\xfd7zXZ\x00', lzma.LZMADecompressor),
+]
+_MAGIC_LENGTH = max(len(magic) for magic, _ in _DECOMPRESSORS)
+
 
 def get_iso_8601_date() -> str:
     """Get the current date as a string in YYYYMMDD format."""
@@ -25,15 +65,157 @@ def is_url(s: str) -> bool:
     return urlparse(s).scheme != ""
 
 
-def download(url: str) -> requests.Response:
-    """Download an URL or file using :py:mod:`requests`.
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """An HTTP adapter that applies a default timeout to requests that don't set their own."""
 
-    :raises: requests.exceptions.HTTPError
+    def __init__(self, *args, timeout: Timeout = DEFAULT_TIMEOUT, **kwargs) -> None:
+        """Initialize the adapter.
+
+        :param timeout: The default timeout, either in seconds or as a pair of connect and read timeouts
+        """
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):  # noqa: D102
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def make_session(pool_connections: int = 10,
+                 pool_maxsize: int = 32,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.3,
+                 timeout: Timeout = DEFAULT_TIMEOUT,
+                 ) -> requests.Session:
+    """Make a session with pooled connections, retries, and timeouts that can also open ``file://`` URLs.
+
+    :param pool_connections: The number of hosts for which connection pools are kept
+    :param pool_maxsize: The maximum number of connections kept open to each host
+    :param max_retries: The number of times a request is retried after connection errors
+     or server errors (429, 500, 502, 503, and 504)
+    :param backoff_factor: The factor for the exponential sleep between retries
+    :param timeout: The default timeout, either in seconds or as a pair of connect and read timeouts
     """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        timeout=timeout,
+    )
+
     session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
     session.mount('file://', FileAdapter())
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the session shared by all downloads that don't give their own, making it on first use."""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """Replace the shared session, for example with one from :func:`make_session` with other settings.
+
+    :param session: The new shared session. If none, a new default one is made on next use.
+    """
+    global _session
+
+    with _session_lock:
+        _session = session
+
 
-    res = session.get(url)
+def download(url: str,
+             headers: Optional[Mapping[str, str]] = None,
+             session: Optional[requests.Session] = None,
+             stream: bool = False,
+             ) -> requests.Response:
+    """Download an URL or file using :py:mod:`requests`.
+
+    :param url: The URL to download
+    :param headers: Extra HTTP headers to send, such as the ones for a conditional request
+    :param session: The session to use. Defaults to the one from :func:`get_session`.
+    :param stream: Should the body be read lazily? If so, the response should be closed after reading it.
+    :raises: requests.exceptions.HTTPError
+    """
+    if session is None:
+        session = get_session()
+
+    res = session.get(url, headers=headers, stream=stream)
     res.raise_for_status()
 
     return res
+
+
+def open_resource(path: str, mode: str = 'r') -> IO:
+    """Open a file in text mode, transparently (de)compressing it if it ends with ``.gz``, ``.bz2``, or ``.xz``.
+
+    :param path: The path to the file. Expands user.
+    :param mode: Either ``r`` for reading, ``w`` for writing, or ``a`` for appending
+    """
+    path = os.path.expanduser(path)
+
+    for extension, opener in COMPRESSED_OPENERS.items():
+        if path.endswith(extension):
+            return opener(path, mode + 't', encoding='utf-8')
+
+    return open(path, mode)
+
+
+def iter_decompressed(chunks: Iterable[bytes]) -> Iterable[bytes]:
+    """Decompress chunks of bytes incrementally if they start with the magic bytes of gzip, bz2, or xz.
+
+    Other chunks are passed through unchanged. This is useful for downloads, where HTTP ``Content-Encoding``
+    has already been handled by :mod:`requests` but the resource itself might be a compressed file. Files with
+    several concatenated streams, like the ones written by ``pigz``, ``bgzip``, or ``pbzip2``, are decompressed
+    completely, like with :func:`open_resource`.
+
+    :param chunks: An iterable of chunks of bytes
+    """
+    chunks = iter(chunks)
+
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if _MAGIC_LENGTH <= len(head):
+            break
+
+    for magic, make_decompressor in _DECOMPRESSORS:
+        if head.startswith(magic):
+            break
+    else:
+        if head:
+            yield head
+        yield from chunks
+        return
+
+    yield from _iter_decompressed_streams(make_decompressor, itertools.chain([head], chunks))
+
+
+def _iter_decompressed_streams(make_decompressor: MakeDecompressor, chunks: Iterable[bytes]) -> Iterable[bytes]:
+    """Decompress chunks of bytes, starting a new decompressor after each stream ends."""
+    decompressor = make_decompressor()
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk)
+            if not decompressor.eof:
+                break
+            # the stream ended, so the rest of the chunk starts the next one
+            chunk = decompressor.unused_data
+            decompressor = make_decompressor()
+
+    if hasattr(decompressor, 'flush'):
+        yield decompressor.flush()
@@ -7,7 +7,10 @@ from itertools import chain
 from typing import Iterable, Mapping, Optional, TextIO, Tuple, Union
 
 from .utils import get_iso_8601_date
-from .write_utils import DATETIME_FMT, iter_author_header, iter_body, iter_citation_header, iter_properties_header
+from .write_utils import (
+    DATETIME_FMT, DEFAULT_BUFFER_SIZE, iter_author_header, iter_body, iter_citation_header, iter_properties_header,
+    write_lines,
+)
 
 __all__ = [
     'write_annotation',
@@ -27,7 +30,10 @@ def write_annotation(keyword: str,
                      case_sensitive: bool = True,
                      delimiter: str = '|',
                      cacheable: bool = True,
-                     file: Optional[TextIO] = None,
+                     max_in_memory: Optional[int] = None,
+                     presorted: bool = False,
+                     buffer_size: int = DEFAULT_BUFFER_SIZE,
+                     file: Union[None, str, TextIO] = None,
                      ) -> None:
     """Write a BEL annotation (BELANNO) to a file.
 
@@ -44,7 +50,13 @@ def write_annotation(keyword: str,
     :param case_sensitive: Should this config file be interpreted as case-sensitive?
     :param delimiter: The delimiter between names and labels in this config file
     :param cacheable: Should this config file be cached?
-    :param file: A writable file or file-like
+    :param max_in_memory: If given, the values are sorted on disk keeping at most this many in memory at once,
+     which is useful when they are given as an iterable that doesn't fit in memory
+    :param presorted: If true, the values are already sorted by name, so they are written lazily in the
+     order they are given
+    :param buffer_size: The number of lines that are joined and written at once
+    :param file: A writable file or file-like, or a path to a file. Paths ending with ``.gz``, ``.bz2``,
+     or ``.xz`` are compressed accordingly.
     """
     if isinstance(values, Mapping):
         values = values.items()
@@ -74,9 +86,11 @@ def write_annotation(keyword: str,
     body_lines = iter_body(
         values=values,
         delimiter=delimiter,
+        max_in_memory=max_in_memory,
+        presorted=presorted,
     )
-    for line in chain(nominal_lines, header_lines, citation_lines, property_lines, body_lines):
-        print(line, file=file)
+    lines = chain(nominal_lines, header_lines, citation_lines, property_lines, body_lines)
+    write_lines(lines, file=file, buffer_size=buffer_size)
 
 
 def iter_annotation_nominal(keyword: str,
@@ -8,7 +8,10 @@ from typing import Iterable, Mapping, Optional, TextIO, Tuple, Union
 
 from .constants import NAMESPACE_DOMAIN_OTHER, NAMESPACE_DOMAIN_TYPES
 from .utils import get_iso_8601_date
-from .write_utils import DATETIME_FMT, iter_author_header, iter_body, iter_citation_header, iter_properties_header
+from .write_utils import (
+    DATETIME_FMT, DEFAULT_BUFFER_SIZE, iter_author_header, iter_body, iter_citation_header, iter_properties_header,
+    write_lines,
+)
 
 __all__ = [
     'write_namespace',
@@ -36,7 +39,10 @@ def write_namespace(
     case_sensitive: bool = True,
     delimiter: str = '|',
     cacheable: bool = True,
-    file: Optional[TextIO] = None,
+    max_in_memory: Optional[int] = None,
+    presorted: bool = False,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    file: Union[None, str, TextIO] = None,
 ) -> None:
     """Write a BEL namespace (BELNS) to a file.
 
@@ -62,7 +68,13 @@ def write_namespace(
     :param case_sensitive: Should this config file be interpreted as case-sensitive?
     :param delimiter: The delimiter between names and labels in this config file
     :param cacheable: Should this config file be cached?
-    :param file: A writable file or file-like
+    :param max_in_memory: If given, the values are sorted on disk keeping at most this many in memory at once,
+     which is useful when they are given as an iterable that doesn't fit in memory
+    :param presorted: If true, the values are already sorted by name, so they are written lazily in the
+     order they are given
+    :param buffer_size: The number of lines that are joined and written at once
+    :param file: A writable file or file-like, or a path to a file. Paths ending with ``.gz``, ``.bz2``,
+     or ``.xz`` are compressed accordingly.
     """
     header_lines = iter_namespace_nominal(
         namespace_name,
@@ -94,9 +106,11 @@ def write_namespace(
     body_lines = iter_body(
         values,
         delimiter=delimiter,
+        max_in_memory=max_in_memory,
+        presorted=presorted,
     )
-    for line in chain(header_lines, author_lines, citation_lines, property_lines, body_lines):
-        print(line, file=file)
+    lines = chain(header_lines, author_lines, citation_lines, property_lines, body_lines)
+    write_lines(lines, file=file, buffer_size=buffer_size)
 
 
 def iter_namespace_nominal(
@@ -3,10 +3,29 @@
 """Shared utilities for writing BEL namespace and annotation files."""
 
 import getpass
-from typing import Iterable, Mapping, Optional, Tuple, Union
+import heapq
+import json
+import os
+import sys
+import tempfile
+from contextlib import ExitStack
+from itertools import chain, islice
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple, TypeVar, Union
+
+from .utils import open_resource
 
 DATETIME_FMT = '%Y-%m-%dT%H:%M:%S'
 
+#: The default number of lines that are joined and written at once by :func:`write_lines`
+DEFAULT_BUFFER_SIZE = 1 << 12
+
+#: The default maximum number of sorted runs merged at once by :func:`iter_external_sorted`, which bounds the
+#: number of files it has open at once
+DEFAULT_MAX_MERGED = 32
+
+#: A pair of a name and its encoding, which might be missing
+Pair = TypeVar('Pair', Tuple[str, str], Tuple[str, Optional[str]])
+
 
 def iter_author_header(name: Optional[str] = None,
                        contact: Optional[str] = None,
@@ -79,20 +98,38 @@ def iter_properties_header(case_sensitive: bool = True,
 
 def iter_body(values: Union[Iterable[Tuple[str, str]], Mapping[str, str]],
               delimiter: str = '|',
+              max_in_memory: Optional[int] = None,
+              presorted: bool = False,
               ) -> Iterable[str]:
     """Iterate over the lines of the ``[Values]`` section of a BEL resource file.
 
     :param values: A dictionary of labels to their encodings
     :param delimiter: The delimiter between names and labels in this config file
+    :param max_in_memory: If given, the values are sorted with :func:`iter_external_sorted` keeping at most
+     this many of them in memory at once. Names are then sorted as strings.
+    :param presorted: If true, the values are already sorted by name, so they are written lazily in the
+     order they are given
     """
     if isinstance(values, Mapping):
         values = values.items()
     elif not isinstance(values, Iterable):
         raise TypeError('values are not iterable: {}'.format(values))
 
+    if not presorted:
+        if max_in_memory is None:
+            values = sorted(values)
+        else:
+            values = iter_external_sorted(
+                (
+                    (str(key), ''.join(sorted(value)))
+                    for key, value in values
+                ),
+                max_in_memory=max_in_memory,
+            )
+
     yield '[Values]'
 
-    for key, value in sorted(values):
+    for key, value in values:
         if not key:
             continue
 
@@ -104,3 +141,113 @@ def iter_body(values: Union[Iterable[Tuple[str, str]], Mapping[str, str]],
         yield '{}{}{}'.format(key, delimiter, ''.join(sorted(value)))
 
     yield ''
+
+
+def iter_external_sorted(pairs: Iterable[Pair],
+                         max_in_memory: int,
+                         directory: Optional[str] = None,
+                         key: Optional[Callable[[Pair], Any]] = None,
+                         max_merged: int = DEFAULT_MAX_MERGED,
+                         ) -> Iterator[Pair]:
+    """Sort pairs of strings without holding more than a given number of them in memory.
+
+    The pairs are sorted in runs of ``max_in_memory`` that are spilled to temporary files, then the runs
+    are lazily merged, ``max_merged`` at a time. If there are more runs than that, they're first merged in
+    groups into longer runs, as many times as needed. If all of the pairs fit in a single run, nothing is
+    written to disk. The sort is stable, so pairs with the same key stay in the order they were given.
+
+    :param pairs: An iterable of pairs of strings
+    :param max_in_memory: The maximum number of pairs in each run
+    :param directory: The directory for the temporary files. Defaults to the system's temporary directory.
+    :param key: A function of a pair to sort by, like in :func:`sorted`. Defaults to the pair itself.
+    :param max_merged: The maximum number of runs merged at once. At most one more file than this is open
+     at once.
+    """
+    if max_in_memory < 1:
+        raise ValueError('max_in_memory should be positive: {}'.format(max_in_memory))
+    if max_merged < 2:
+        raise ValueError('max_merged should be at least 2: {}'.format(max_merged))
+
+    pairs = iter(pairs)
+    run = sorted(islice(pairs, max_in_memory), key=key)
+    peeked = list(islice(pairs, 1))
+    if not peeked:
+        yield from run
+        return
+
+    pairs = chain(peeked, pairs)
+    with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+        paths = []
+        while run:
+            paths.append(_write_run(run, temporary_directory))
+            run.clear()
+            run = sorted(islice(pairs, max_in_memory), key=key)
+
+        while max_merged < len(paths):
+            paths = [
+                _merge_runs(paths[start:start + max_merged], temporary_directory, key)
+                for start in range(0, len(paths), max_merged)
+            ]
+
+        yield from _iter_merged(paths, key)
+
+
+def _write_run(pairs: Iterable, directory: str) -> str:
+    """Write pairs to a new file in the given directory, one JSON array per line, and get its path."""
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.jsonl')
+    with open(fd, 'w', encoding='utf-8') as file:
+        for pair in pairs:
+            print(json.dumps(pair), file=file)
+    return path
+
+
+def _merge_runs(paths: List[str], directory: str, key: Optional[Callable]) -> str:
+    """Merge sorted runs into a new one, removing them, and get its path."""
+    path = _write_run(_iter_merged(paths, key), directory)
+    for merged_path in paths:
+        os.remove(merged_path)
+    return path
+
+
+def _iter_merged(paths: List[str], key: Optional[Callable]) -> Iterable:
+    """Merge sorted runs, keeping the ones that come first in the given order first among equal pairs."""
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(open(path, encoding='utf-8'))
+            for path in paths
+        ]
+        yield from heapq.merge(*(_iter_run(file) for file in files), key=key)
+
+
+def _iter_run(file) -> Iterable:
+    for line in file:
+        yield tuple(json.loads(line))
+
+
+def write_lines(lines: Iterable[str],
+                file: Union[None, str, TextIO] = None,
+                buffer_size: int = DEFAULT_BUFFER_SIZE,
+                ) -> None:
+    """Write lines to a file, joining them in batches so there's one write call per batch instead of per line.
+
+    :param lines: An iterable of lines, without their trailing newlines
+    :param file: A writable file or file-like, or a path to a file. Paths ending with ``.gz``, ``.bz2``, or ``.xz``
+     are compressed accordingly. Defaults to standard out.
+    :param buffer_size: The number of lines in each batch
+    """
+    if isinstance(file, str):
+        with open_resource(file, 'w') as opened_file:
+            _write_batches(lines, opened_file.write, buffer_size)
+    else:
+        _write_batches(lines, (sys.stdout if file is None else file).write, buffer_size)
+
+
+def _write_batches(lines: Iterable[str], write: Callable[[str], Any], buffer_size: int) -> None:
+    lines = iter(lines)
+
+    while True:
+        batch = list(islice(lines, buffer_size))
+        if not batch:
+            break
+        batch.append('')
+        write('\n'.join(batch))
@@ -27,11 +27,22 @@ class MockResponse:
         else:
             raise ValueError
 
+        self.status_code = 200
+        self.headers = {}
+
     def iter_lines(self):
         """Iterate the lines of the mock file."""
         with open(self.path, 'rb') as file:
             yield from file
 
+    def iter_content(self, chunk_size: int = 1):
+        """Iterate the chunks of the mock file."""
+        with open(self.path, 'rb') as file:
+            yield from iter(lambda: file.read(chunk_size), b'')
+
+    def close(self):
+        """Mock closing the response by not doing anything."""
+
     def raise_for_status(self):
         """Mock raising an error, by not doing anything at all."""
 
@@ -43,7 +54,7 @@ class MockSession:
         """Mock mounting an adapter by not doing anything."""
 
     @staticmethod
-    def get(url: str):
+    def get(url: str, **_):
         """Mock getting a URL by returning a mock response."""
         return MockResponse(url)
 
@@ -51,4 +62,4 @@ class MockSession:
         """Mock closing a connection by not doing anything."""
 
 
-mock_bel_resources = mock.patch('bel_resources.utils.requests.Session', side_effect=MockSession)
+mock_bel_resources = mock.patch('bel_resources.utils.get_session', side_effect=MockSession)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting many OBO files in parallel."""
+
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from bel_resources import get_bel_resource
+from bel_resources.batch import convert_obo_batch, read_manifest
+from bel_resources.cli import main
+from tests.test_obo import OBO
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class TestBatch(unittest.TestCase):
+    """Tests for the batch conversion of OBO files."""
+
+    def setUp(self):
+        """Write an OBO file and a manifest with a good and a missing source to a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.obo_path = os.path.join(self.directory, 'test.obo')
+        with open(self.obo_path, 'w') as file:
+            file.write(OBO)
+
+        self.names_path = os.path.join(self.directory, 'names.belns')
+        self.annotation_path = os.path.join(self.directory, 'test.belanno')
+        self.missing_path = os.path.join(self.directory, 'missing.obo')
+        self.jobs = [
+            {
+                'source': self.obo_path,
+                'outputs': {'names': self.names_path, 'annotation': self.annotation_path},
+                'options': {'encoding': 'O'},
+            },
+            {
+                'source': self.missing_path,
+                'outputs': {'identifiers': os.path.join(self.directory, 'missing.belns')},
+            },
+        ]
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        with open(self.manifest_path, 'w') as file:
+            json.dump(self.jobs, file)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_read_manifest(self):
+        """Test reading a manifest."""
+        self.assertEqual(self.jobs, read_manifest(self.manifest_path))
+
+    def test_read_bad_manifest(self):
+        """Test that jobs with unknown outputs or options are rejected before any are converted."""
+        for job in (
+            {'outputs': {'names': 'a.belns'}},
+            {'source': self.obo_path, 'outputs': {}},
+            {'source': self.obo_path, 'outputs': {'synonyms': 'a.belns'}},
+            {'source': self.obo_path, 'outputs': {'names': 'a.belns'}, 'options': {'use_names': True}},
+        ):
+            with open(self.manifest_path, 'w') as file:
+                json.dump([job], file)
+            with self.assertRaises(ValueError):
+                read_manifest(self.manifest_path)
+
+    def test_convert(self):
+        """Test that a failed job is reported without stopping the others."""
+        results = {
+            result.source: result
+            for result in convert_obo_batch(self.jobs, max_workers=2)
+        }
+        self.assertEqual({self.obo_path, self.missing_path}, set(results))
+
+        result = results[self.obo_path]
+        self.assertIsNone(result.error)
+        self.assertLessEqual(0, result.seconds)
+        self.assertEqual(self.jobs[0]['outputs'], result.outputs)
+        self.assertEqual(
+            {'first term': 'O', 'second term': 'O'},
+            get_bel_resource(self.names_path)['Values'],
+        )
+        self.assertEqual('test', get_bel_resource(self.annotation_path)['AnnotationDefinition']['Keyword'])
+
+        self.assertIsNotNone(results[self.missing_path].error)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'missing.belns')))
+
+    @unittest.skipIf(resource is None, 'memory limits need the resource module')
+    def test_convert_memory_limit(self):
+        """Test that a job over its memory limit fails without writing its outputs."""
+        with open(self.obo_path, 'a') as file:
+            file.write('\n[Term]\nid: TEST:1000000\nname: {}\n'.format('x' * 2 ** 25))
+
+        results = list(convert_obo_batch(self.jobs[:1], max_workers=1, memory_limit=1))
+        self.assertEqual(1, len(results))
+        self.assertIn('MemoryError', results[0].error)
+        self.assertFalse(os.path.exists(self.names_path))
+
+    def test_convert_keeps_outputs(self):
+        """Test that a failed job leaves the outputs from before it as they were, without temporary files."""
+        old_path = os.path.join(self.directory, 'missing.belns')
+        with open(old_path, 'w') as file:
+            file.write('old')
+        files = sorted(os.listdir(self.directory))
+
+        results = list(convert_obo_batch(self.jobs[1:], max_workers=1))
+        self.assertIsNotNone(results[0].error)
+        with open(old_path) as file:
+            self.assertEqual('old', file.read())
+        self.assertEqual(files, sorted(os.listdir(self.directory)))
+
+    @unittest.skipIf(not hasattr(os, 'mkfifo'), 'killing a blocked job needs named pipes')
+    def test_convert_killed(self):
+        """Test that a job whose process is killed is reported without stopping the others."""
+        # reading from a named pipe without a writer blocks until the process is killed
+        os.mkfifo(self.missing_path)
+
+        results = convert_obo_batch(self.jobs, max_workers=2)
+        result = next(results)
+        self.assertEqual(self.obo_path, result.source)
+        self.assertIsNone(result.error)
+
+        for process in multiprocessing.active_children():
+            os.kill(process.pid, signal.SIGKILL)
+
+        result = next(results)
+        self.assertEqual(self.missing_path, result.source)
+        self.assertIn('stopped unexpectedly', result.error)
+        self.assertEqual([], list(results))
+
+        self.assertEqual({'first term': 'O', 'second term': 'O'}, get_bel_resource(self.names_path)['Values'])
+        self.assertEqual(
+            ['manifest.json', 'missing.obo', 'names.belns', 'test.belanno', 'test.obo'],
+            sorted(os.listdir(self.directory)),
+        )
+
+    @unittest.skipIf(not hasattr(os, 'mkfifo'), 'stopping a blocked job needs named pipes')
+    def test_convert_stopped(self):
+        """Test that jobs still running when the results are no longer wanted are stopped and cleaned up."""
+        os.mkfifo(self.missing_path)
+
+        results = convert_obo_batch(self.jobs, max_workers=2)
+        self.assertIsNone(next(results).error)
+        results.close()
+
+        self.assertEqual([], multiprocessing.active_children())
+        self.assertEqual(
+            ['manifest.json', 'missing.obo', 'names.belns', 'test.belanno', 'test.obo'],
+            sorted(os.listdir(self.directory)),
+        )
+
+    def test_convert_empty(self):
+        """Test that an empty batch doesn't start any processes."""
+        self.assertEqual([], list(convert_obo_batch([])))
+
+    def test_cli(self):
+        """Test the batch command outputs a result for each job and fails if any job did."""
+        result = CliRunner().invoke(main, ['obo', 'batch', self.manifest_path, '--workers', '2'])
+        self.assertEqual(1, result.exit_code)
+
+        results = [json.loads(line) for line in result.output.splitlines() if line.startswith('{')]
+        self.assertEqual(
+            {self.obo_path: None, self.missing_path: True},
+            {r['source']: (r['error'] and True) for r in results},
+        )
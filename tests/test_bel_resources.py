@@ -2,15 +2,32 @@
 
 """Tests for utilities for BEL resources."""
 
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
 import time
 import unittest
-
-from bel_resources import EmptyResourceError, get_bel_resource, split_file_to_annotations_and_definitions
-from bel_resources.read_document import sanitize_file_lines
-from bel_resources.utils import get_iso_8601_date
+from operator import itemgetter
+from unittest import mock
+
+from bel_resources import (
+    EmptyResourceError, IncrementalSplitter, MissingResourceError, UnfinishedLineError, get_bel_resource,
+    get_bel_resources, split_file_lazily, split_file_to_annotations_and_definitions, write_namespace,
+)
+from bel_resources.read_document import (
+    _iter_chunks, _merge_sanitized_chunks, _sanitize_chunk, sanitize_file_lines, sanitize_file_lines_fast,
+    sanitize_file_lines_parallel,
+)
+from bel_resources.read_utils import iter_bel_resource, iter_chunk_lines
+from bel_resources.utils import download, get_iso_8601_date, get_session, iter_decompressed, make_session
+from bel_resources.write_utils import iter_body, iter_external_sorted, write_lines
 from tests.constants import TEST_ANNOTATION_PATH, TEST_NAMESPACE_EMPTY_PATH
 from tests.examples import simple
-from tests.mocks import mock_bel_resources
+from tests.mocks import MockResponse, mock_bel_resources
 
 
 class TestUtils(unittest.TestCase):
@@ -24,6 +41,18 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(d[4:6], time.strftime('%m'))
         self.assertEqual(d[6:8], time.strftime('%d'))
 
+    def test_shared_session(self):
+        """Test that downloads share a pooled session by default."""
+        self.assertIs(get_session(), get_session())
+
+        session = make_session(pool_maxsize=4, timeout=5)
+        adapter = session.get_adapter('https://example.com')
+        self.assertEqual(5, adapter.timeout)
+        self.assertEqual(4, adapter._pool_maxsize)
+
+        res = download('file://' + TEST_ANNOTATION_PATH, session=session)
+        self.assertTrue(res.text.startswith('[AnnotationDefinition]'))
+
 
 class TestBELResources(unittest.TestCase):
     """Test utilities for BEL resources."""
@@ -63,6 +92,143 @@ class TestBELResources(unittest.TestCase):
             res = get_bel_resource('https://example.com/test_an_1.belanno')
         self._help_test_annotation(res)
 
+    def test_get_many(self):
+        """Test getting several resources at once, where some of them fail."""
+        missing_path = TEST_ANNOTATION_PATH + '.missing'
+        results = dict(get_bel_resources(
+            [TEST_ANNOTATION_PATH, TEST_NAMESPACE_EMPTY_PATH, missing_path, TEST_ANNOTATION_PATH],
+            max_workers=2,
+        ))
+
+        self.assertEqual(3, len(results))
+        self._help_test_annotation(results[TEST_ANNOTATION_PATH])
+        self.assertIsInstance(results[TEST_NAMESPACE_EMPTY_PATH], EmptyResourceError)
+        self.assertIsInstance(results[missing_path], MissingResourceError)
+        self.assertEqual(missing_path, results[missing_path].location)
+
+    def test_iter_chunk_lines(self):
+        """Test splitting lines over chunks that cut through lines and multi-byte characters."""
+        text = 'first line\r\n\nsecond lïne  \nthird'
+        expected = ['first line', '', 'second lïne', 'third']
+        data = text.encode('utf-8')
+
+        for chunk_size in (1, 2, 3, 7, len(data)):
+            chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+            self.assertEqual(expected, list(iter_chunk_lines(chunks)), msg='chunk size: {}'.format(chunk_size))
+
+    def test_iter_bel_resource(self):
+        """Test that the header is parsed before the values are consumed."""
+        with open(TEST_ANNOTATION_PATH) as file:
+            lines = iter(file)
+            header, values = iter_bel_resource(lines)
+            self.assertEqual('TESTAN1', header['AnnotationDefinition']['Keyword'])
+            self.assertEqual('|', header['Processing']['DelimiterString'])
+            self.assertNotIn('Values', header)
+            self.assertEqual('TestAnnot1|O\n', next(lines), msg='values should not be consumed eagerly')
+            self.assertEqual(('TestAnnot2', 'O'), next(values))
+            self.assertEqual(3, len(list(values)))
+
+    def test_iter_bel_resource_missing_values(self):
+        """Test that a resource without a ``[Values]`` section is invalid."""
+        with self.assertRaises(ValueError):
+            iter_bel_resource(['[Processing]', 'DelimiterString=|'])
+
+
+class TestExternalSort(unittest.TestCase):
+    """Test sorting values on disk for writing."""
+
+    def test_iter_external_sorted(self):
+        """Test that runs spilled to disk are merged back in order."""
+        pairs = [('name{}'.format(i % 17), 'encoding\n"{}"'.format(i)) for i in range(50)]
+        for max_in_memory in (1, 3, 50, 100):
+            self.assertEqual(
+                sorted(pairs),
+                list(iter_external_sorted(iter(pairs), max_in_memory=max_in_memory)),
+                msg='max in memory: {}'.format(max_in_memory),
+            )
+
+    def test_iter_external_sorted_passes(self):
+        """Test that runs merged in several passes stay sorted and stable."""
+        pairs = [('name{}'.format(i % 7), str(i)) for i in range(100)]
+        for max_merged in (2, 3, 32):
+            self.assertEqual(
+                sorted(pairs, key=itemgetter(0)),
+                list(iter_external_sorted(iter(pairs), max_in_memory=3, key=itemgetter(0), max_merged=max_merged)),
+                msg='max merged: {}'.format(max_merged),
+            )
+
+        with self.assertRaises(ValueError):
+            list(iter_external_sorted(iter(pairs), max_in_memory=3, max_merged=1))
+
+    def test_iter_body(self):
+        """Test that the body is the same when sorted on disk."""
+        values = {' B ': 'GR', 'A': 'P', 'C': 'OA', '': 'O'}
+        self.assertEqual(
+            list(iter_body(values)),
+            list(iter_body((pair for pair in values.items()), max_in_memory=2)),
+        )
+
+
+class TestWriteLines(unittest.TestCase):
+    """Test writing lines in batches."""
+
+    def test_batches(self):
+        """Test that the output doesn't depend on the batch size."""
+        lines = ['[Values]', 'A|P', '', 'B|GR', '']
+        for buffer_size in (1, 2, 5, 100):
+            file = io.StringIO()
+            write_lines(iter(lines), file=file, buffer_size=buffer_size)
+            self.assertEqual('[Values]\nA|P\n\nB|GR\n\n', file.getvalue(), msg='buffer size: {}'.format(buffer_size))
+
+
+class TestCompression(unittest.TestCase):
+    """Test reading and writing compressed resources."""
+
+    def setUp(self):
+        """Make a temporary directory for the compressed files."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_write_and_read(self):
+        """Test writing a namespace to compressed files then reading them back."""
+        values = {'A': 'P', 'B': 'GR'}
+        for extension in ('', '.gz', '.bz2', '.xz'):
+            path = os.path.join(self.directory, 'test.belns' + extension)
+            write_namespace(values, 'Test', 'TEST', file=path)
+            res = get_bel_resource(path)
+            self.assertEqual(values, res['Values'], msg='extension: {}'.format(extension))
+
+        with open(os.path.join(self.directory, 'test.belns.gz'), 'rb') as file:
+            self.assertEqual(b'\x1f\x8b', file.read(2))
+
+    def test_download(self):
+        """Test downloading a compressed resource."""
+        path = os.path.join(self.directory, 'test_an_1.belanno.gz')
+        with open(TEST_ANNOTATION_PATH, 'rb') as source, gzip.open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+        response = MockResponse('https://example.com/test_an_1.belanno')
+        response.path = path
+        with mock.patch('bel_resources.read_utils.download', return_value=response):
+            res = get_bel_resource('https://example.com/test_an_1.belanno.gz')
+
+        self.assertEqual(5, len(res['Values']))
+
+    def test_multiple_streams(self):
+        """Test decompressing files with several concatenated streams, in chunks that split them anywhere."""
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            data = compress(b'a|b\nc|d\n') + compress(b'e|f\n') + compress(b'g|h\n')
+            for size in (1, 7, len(data)):
+                chunks = [data[i:i + size] for i in range(0, len(data), size)]
+                self.assertEqual(
+                    b'a|b\nc|d\ne|f\ng|h\n',
+                    b''.join(iter_decompressed(chunks)),
+                    msg='{} in chunks of {}'.format(compress.__module__, size),
+                )
+
 
 class TestSplitLines(unittest.TestCase):
     """Test splitting file into annotations and definitions."""
@@ -75,18 +241,57 @@ class TestSplitLines(unittest.TestCase):
         self.assertEqual(4, len(list(definitions)))
         self.assertEqual(14, len(list(statements)))
 
+    def test_lazy(self):
+        """Test splitting lazily gives the same parts as splitting, including at the edges."""
+        cases = [
+            simple.splitlines(),
+            [],
+            ['SET DOCUMENT Name = "Test"'],
+            ['p(HGNC:A) -> p(HGNC:B)', 'p(HGNC:C) -> p(HGNC:D)'],
+        ]
+        for lines in cases:
+            expected = [list(part) for part in split_file_to_annotations_and_definitions(lines)]
+            metadata, definitions, statements = split_file_lazily(lines)
+            self.assertIsInstance(metadata, list)
+            self.assertIsInstance(definitions, list)
+            self.assertEqual(expected, [metadata, definitions, list(statements)], msg=str(lines))
+
+    def test_lazy_without_statements(self):
+        """Test that the line ending the metadata isn't repeated in the statements when there are none."""
+        lines = ['SET DOCUMENT Name = "Test"', 'DEFINE NAMESPACE HGNC AS URL "https://example.com/hgnc.belns"']
+        metadata, definitions, statements = split_file_lazily(lines)
+        self.assertEqual([(1, lines[0])], metadata)
+        self.assertEqual([(2, lines[1])], definitions)
+        self.assertEqual([], list(statements))
+
+    def test_lazy_statements(self):
+        """Test that the statements are only read as they are consumed."""
+        consumed = []
+
+        def _iter_lines():
+            for line in simple.splitlines():
+                consumed.append(line)
+                yield line
+
+        _, _, statements = split_file_lazily(_iter_lines())
+        self.assertLess(len(consumed), len(simple.splitlines()))
+        self.assertEqual(14, sum(1 for _ in statements))
+        self.assertEqual(len(simple.splitlines()), len(consumed))
+
 
 class TestSanitizeLines(unittest.TestCase):
     """Tests for :py:func:`sanitize_file_lines`."""
 
+    sanitize = staticmethod(sanitize_file_lines)
+
     def test_count(self):
         """Test that the right number of lines are retrieved."""
         lines = simple.splitlines()
-        lines = list(sanitize_file_lines(lines))
+        lines = list(self.sanitize(lines))
         self.assertEqual(26, len(lines))
 
     def _help_test_line(self, statement: str, expect: str) -> None:
-        lines = list(sanitize_file_lines(statement.split('\n')))
+        lines = list(self.sanitize(statement.split('\n')))
         self.assertEqual(1, len(lines))
         line = lines[0][1]
         self.assertEqual(expect, line)
@@ -151,7 +356,7 @@ third line"'''
             'or other"'
         ]
 
-        result = list(sanitize_file_lines(s))
+        result = list(self.sanitize(s))
         expect = [(1, 'SET Evidence = "Something or other or other"')]
 
         self.assertEqual(expect, result)
@@ -169,7 +374,7 @@ third line"'''
             'CIS, SOCS-1, and SOCS-3 had ret'
         ]
 
-        result = list(sanitize_file_lines(statements))
+        result = list(self.sanitize(statements))
 
         expect = [
             (2, 'SET Species = 9606'),
@@ -188,7 +393,140 @@ third line"'''
             'SET Evidence = "yada yada yada" //this is a comment'
         ]
 
-        result = list(sanitize_file_lines(s))
+        result = list(self.sanitize(s))
         expect = [(1, 'SET Evidence = "yada yada yada"')]
 
         self.assertEqual(expect, result)
+
+
+class TestSanitizeLinesFast(TestSanitizeLines):
+    """Tests for :py:func:`sanitize_file_lines_fast` giving the same results as :py:func:`sanitize_file_lines`."""
+
+    sanitize = staticmethod(sanitize_file_lines_fast)
+
+    def test_same(self):
+        """Test that the results are the same as the reference implementation, including the line numbers."""
+        lines = simple.splitlines() + TestSanitizeLinesParallel.lines
+        self.assertEqual(list(sanitize_file_lines(lines)), list(sanitize_file_lines_fast(lines)))
+
+    def test_unfinished(self):
+        """Test that an unfinished line at the end raises the same error as the reference implementation."""
+        for lines in (['SET Evidence = "Something', 'or other'], ['SET Evidence = "Something \\']):
+            with self.assertRaises(RuntimeError):
+                list(sanitize_file_lines(lines))
+            with self.assertRaises(UnfinishedLineError) as context:
+                list(sanitize_file_lines_fast(lines))
+            self.assertEqual(1, context.exception.line_number)
+
+
+class TestSanitizeLinesParallel(unittest.TestCase):
+    """Tests for :py:func:`sanitize_file_lines_parallel`."""
+
+    lines = simple.splitlines() + [
+        '# missing line breaks in a quote',
+        'SET Evidence = "Something',
+        '',
+        'SET Species = 9606',
+        'or other"',
+        'p(HGNC:AKT1) -> p(HGNC:EGFR) // a comment',
+        'SET Evidence = "Backward slash \\',
+        '\\',
+        'break"',
+        'SET Evidence = "Something',
+        'or other"',
+    ]
+
+    def test_merge(self):
+        """Test merging chunks of every size gives the same result as sanitizing in order."""
+        expected = list(sanitize_file_lines(self.lines))
+        for chunk_size in range(1, len(self.lines) + 1):
+            chunks = (
+                chunk + _sanitize_chunk(chunk)
+                for chunk in _iter_chunks(self.lines, chunk_size)
+            )
+            self.assertEqual(expected, list(_merge_sanitized_chunks(chunks)), msg='chunk size: {}'.format(chunk_size))
+
+    def test_unfinished(self):
+        """Test that an unfinished quote at the end raises the same error as sanitizing in order."""
+        lines = ['SET Evidence = "Something', 'or other']
+        with self.assertRaises(RuntimeError):
+            list(sanitize_file_lines(lines))
+        with self.assertRaises(UnfinishedLineError):
+            list(_merge_sanitized_chunks(chunk + _sanitize_chunk(chunk) for chunk in _iter_chunks(lines, 1)))
+
+    def test_other_errors(self):
+        """Test that other runtime errors while sanitizing a chunk aren't taken for an unfinished line."""
+        with mock.patch('bel_resources.read_document.sanitize_file_lines_fast', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                _sanitize_chunk((1, ['p(HGNC:AKT1)']))
+
+    def test_parallel(self):
+        """Test sanitizing in a process pool."""
+        self.assertEqual(
+            list(sanitize_file_lines(self.lines)),
+            list(sanitize_file_lines_parallel(self.lines, chunk_size=7, max_workers=2)),
+        )
+
+    def test_split(self):
+        """Test splitting with sanitizing in a process pool."""
+        docs, definitions, statements = split_file_to_annotations_and_definitions(simple.splitlines(), processes=2)
+        self.assertEqual(8, len(list(docs)))
+        self.assertEqual(4, len(list(definitions)))
+        self.assertEqual(14, len(list(statements)))
+
+
+class TestIncrementalSplitter(unittest.TestCase):
+    """Tests for :py:class:`IncrementalSplitter`."""
+
+    lines = TestSanitizeLinesParallel.lines
+
+    @staticmethod
+    def _split(lines):
+        return tuple(
+            list(part)
+            for part in split_file_to_annotations_and_definitions(lines)
+        )
+
+    def test_first(self):
+        """Test that the first split gives the same results as splitting from scratch and adds every statement."""
+        splitter = IncrementalSplitter()
+        result = splitter.split(self.lines)
+        self.assertEqual(self._split(self.lines), tuple(result[:3]))
+        self.assertEqual([line_number for line_number, _ in result.statements], result.added)
+        self.assertEqual([], result.removed)
+        self.assertEqual(0, splitter.hits)
+
+    def test_unchanged(self):
+        """Test that splitting the same document again reuses every block and changes nothing."""
+        splitter = IncrementalSplitter()
+        first = splitter.split(self.lines)
+        second = splitter.split(self.lines)
+        self.assertEqual(first[:3], second[:3])
+        self.assertEqual(0, splitter.misses)
+        self.assertEqual([], second.added)
+        self.assertEqual([], second.removed)
+
+    def test_edit(self):
+        """Test that an edit only sanitizes the block it's in and shifts the line numbers after it."""
+        splitter = IncrementalSplitter()
+        old = splitter.split(self.lines)
+
+        line_number = self.lines.index('p(HGNC:AKT1) -> p(HGNC:EGFR) // a comment') + 1
+        lines = list(self.lines)
+        lines[line_number - 1:line_number] = ['p(HGNC:AKT1) -| p(HGNC:EGFR)', 'p(HGNC:AKT1) -> p(HGNC:MAPT)']
+        new = splitter.split(lines)
+
+        self.assertEqual(self._split(lines), tuple(new[:3]))
+        self.assertEqual(1, splitter.misses)
+        self.assertLess(0, splitter.hits)
+        self.assertIn(line_number, new.removed)
+        self.assertIn(line_number, new.added)
+        self.assertIn(line_number + 1, new.added)
+        self.assertNotIn(1, new.removed)
+
+        old_statements = {line for _, line in old.statements}
+        new_statements = {line for _, line in new.statements}
+        self.assertEqual(
+            {'p(HGNC:AKT1) -| p(HGNC:EGFR)', 'p(HGNC:AKT1) -> p(HGNC:MAPT)'},
+            new_statements - old_statements,
+        )
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the on-disk cache of BEL resources."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from bel_resources import get_bel_resource
+from bel_resources.cache import LRUResourceCache, ResourceCache
+from tests.constants import TEST_ANNOTATION_PATH
+from tests.mocks import MockResponse
+
+URL = 'https://example.com/test_an_1.belanno'
+
+
+class TestResourceCache(unittest.TestCase):
+    """Tests for :class:`ResourceCache`."""
+
+    def setUp(self):
+        """Make a temporary directory for the cache and a copy of the test annotation."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResourceCache(os.path.join(self.directory, 'cache'))
+        self.path = os.path.join(self.directory, 'test_an_1.belanno')
+        shutil.copy(TEST_ANNOTATION_PATH, self.path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_path(self):
+        """Test that a local file is only reparsed after it changes."""
+        res = get_bel_resource(self.path, cache=self.cache)
+        self.assertEqual(5, len(res['Values']))
+
+        with mock.patch('bel_resources.cache.load_bel_resource') as load:
+            self.assertEqual(res, self.cache.get_bel_resource(self.path))
+            load.assert_not_called()
+
+        with open(self.path, 'a') as file:
+            print('TestAnnot6|O', file=file)
+        os.utime(self.path, ns=(0, 0))
+
+        self.assertEqual(6, len(self.cache.get_bel_resource(self.path)['Values']))
+
+    def test_not_modified(self):
+        """Test that a ``304 Not Modified`` answer reuses the stored resource."""
+        response = MockResponse(URL)
+        response.headers['ETag'] = '"abc"'
+        with mock.patch('bel_resources.cache.download', return_value=response):
+            res = self.cache.get_bel_resource(URL)
+
+        response = MockResponse(URL)
+        response.status_code = 304
+        response.close = mock.Mock()
+        with mock.patch('bel_resources.cache.download', return_value=response) as download:
+            self.assertEqual(res, self.cache.get_bel_resource(URL))
+        download.assert_called_once_with(URL, headers={'If-None-Match': '"abc"'}, session=None, stream=True)
+        response.close.assert_called_once_with()
+
+    def test_not_modified_missing_data(self):
+        """Test that a ``304 Not Modified`` answer is closed before downloading again if the data went missing."""
+        response = MockResponse(URL)
+        response.headers['ETag'] = '"abc"'
+        with mock.patch('bel_resources.cache.download', return_value=response):
+            res = self.cache.get_bel_resource(URL)
+        os.remove(self.cache._get_path_for(self.cache._get_key(URL), '.pickle'))
+
+        not_modified = MockResponse(URL)
+        not_modified.status_code = 304
+        not_modified.close = mock.Mock()
+        with mock.patch('bel_resources.cache.download', side_effect=[not_modified, MockResponse(URL)]) as download:
+            self.assertEqual(res, self.cache.get_bel_resource(URL))
+        self.assertEqual(2, download.call_count)
+        not_modified.close.assert_called_once_with()
+
+    def test_session(self):
+        """Test that the session given to the cache or to each call is used for downloads."""
+        session = mock.Mock()
+        with mock.patch('bel_resources.cache.download', return_value=MockResponse(URL)) as download:
+            get_bel_resource(URL, cache=self.cache, session=session)
+        download.assert_called_once_with(URL, headers={}, session=session, stream=True)
+
+        self.cache.invalidate(URL)
+        self.cache.session = session
+        with mock.patch('bel_resources.cache.download', return_value=MockResponse(URL)) as download:
+            get_bel_resource(URL, cache=self.cache)
+        download.assert_called_once_with(URL, headers={}, session=session, stream=True)
+
+    def test_not_modified_refreshes(self):
+        """Test that a ``304 Not Modified`` answer makes the entry fresh again."""
+        with mock.patch('bel_resources.cache.download', return_value=MockResponse(URL)):
+            self.cache.get_bel_resource(URL)
+
+        key = self.cache._get_key(URL)
+        meta = self.cache._read_meta(key)
+        meta['fetched'] -= 100
+        self.cache._write_meta(key, meta)
+        os.utime(self.cache._get_path_for(key, '.json'), (0, 0))
+
+        response = MockResponse(URL)
+        response.status_code = 304
+        with mock.patch('bel_resources.cache.download', return_value=response), \
+                mock.patch('time.time', return_value=meta['fetched'] + 100):
+            self.cache.get_bel_resource(URL)
+        self.assertEqual(meta['fetched'] + 100, self.cache._read_meta(key)['fetched'])
+
+    def test_expired(self):
+        """Test that an entry older than the maximum age is downloaded again, without a conditional request."""
+        response = MockResponse(URL)
+        response.headers['ETag'] = '"abc"'
+        with mock.patch('bel_resources.cache.download', return_value=response):
+            res = self.cache.get_bel_resource(URL)
+
+        self.cache.max_age = 10
+        with mock.patch('time.time', return_value=self.cache._read_meta(self.cache._get_key(URL))['fetched'] + 20), \
+                mock.patch('bel_resources.cache.download', return_value=MockResponse(URL)) as download:
+            self.assertEqual(res, self.cache.get_bel_resource(URL))
+        download.assert_called_once_with(URL, headers={}, session=None, stream=True)
+        self.assertEqual(1, len(list(self.cache._iter_keys())))
+
+    def test_temporary_files(self):
+        """Test that writes leave no temporary files behind, even if they fail."""
+        self.cache.get_bel_resource(self.path)
+        self.assertEqual(2, len(os.listdir(self.cache.directory)))
+
+        self.cache.invalidate(self.path)
+        with mock.patch('bel_resources.cache.pickle.dump', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.cache.get_bel_resource(self.path)
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+    def test_not_cacheable(self):
+        """Test that resources with ``CacheableFlag=no`` are not stored."""
+        with open(self.path) as file:
+            text = file.read().replace('CacheableFlag=yes', 'CacheableFlag=no')
+        with open(self.path, 'w') as file:
+            file.write(text)
+
+        self.cache.get_bel_resource(self.path)
+        self.assertEqual([], list(self.cache._iter_keys()))
+
+    def test_evict_by_size(self):
+        """Test that the least recently used entries are evicted when the cache is too large."""
+        self.cache.get_bel_resource(self.path)
+        self.assertEqual(1, len(list(self.cache._iter_keys())))
+
+        self.cache.max_size = 0
+        self.cache.evict()
+        self.assertEqual([], list(self.cache._iter_keys()))
+
+
+class TestLRUResourceCache(unittest.TestCase):
+    """Tests for :class:`LRUResourceCache`."""
+
+    def test_memoize(self):
+        """Test that a resource is only loaded once and shared as a read-only view."""
+        cache = LRUResourceCache()
+        first = cache.get_bel_resource(TEST_ANNOTATION_PATH)
+        second = get_bel_resource(TEST_ANNOTATION_PATH, cache=cache)
+
+        self.assertIs(first, second)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        with self.assertRaises(TypeError):
+            first['Values']['TestAnnot6'] = 'O'
+
+        cache.invalidate(TEST_ANNOTATION_PATH)
+        self.assertNotIn(TEST_ANNOTATION_PATH, cache)
+        self.assertIsNot(first, cache.get_bel_resource(TEST_ANNOTATION_PATH))
+        self.assertEqual(2, cache.misses)
+
+    def test_evict(self):
+        """Test that the least recently used resources are evicted first."""
+        loader = mock.Mock(side_effect=lambda location: {'Values': dict.fromkeys(location, 'O')})
+        cache = LRUResourceCache(max_values=5, loader=loader)
+
+        cache.get_bel_resource('ab')
+        cache.get_bel_resource('cd')
+        cache.get_bel_resource('ab')
+        cache.get_bel_resource('ef')
+
+        self.assertIn('ab', cache)
+        self.assertNotIn('cd', cache)
+        self.assertIn('ef', cache)
+        self.assertEqual(3, loader.call_count)
+
+    def test_session(self):
+        """Test that a session is given to the loader on a miss."""
+        session = mock.Mock()
+        loader = mock.Mock(return_value={'Values': {}})
+        cache = LRUResourceCache(loader=loader)
+
+        get_bel_resource('a', cache=cache, session=session)
+        loader.assert_called_once_with('a', session=session)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the compiled binary format of BEL resources."""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from operator import itemgetter
+
+from click.testing import CliRunner
+
+from bel_resources import CompiledResource, compile_bel_resource, compile_values, get_bel_resource
+from bel_resources.cli import main
+from tests.constants import TEST_ANNOTATION_PATH
+
+
+class TestCompiledResource(unittest.TestCase):
+    """Tests for :class:`CompiledResource`."""
+
+    def setUp(self):
+        """Make a temporary directory for the compiled files."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.belc')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_roundtrip(self):
+        """Test that lookups match the original values over several blocks."""
+        values = {
+            'name{}'.format(i): 'GRP'[:i % 3 + 1]
+            for i in range(100)
+        }
+        values['ünïcode'] = 'A'
+        values['name'] = None
+
+        compile_values(values, self.path, block_size=4)
+
+        with CompiledResource(self.path) as resource:
+            self.assertEqual(len(values), len(resource))
+            self.assertEqual(values, dict(resource.items()))
+            self.assertEqual(sorted(values.items(), key=itemgetter(0)), list(resource.items()))
+            self.assertIn(('name', None), resource.items())
+            self.assertEqual(sorted(values), list(resource))
+            for name, encoding in values.items():
+                self.assertIn(name, resource)
+                self.assertEqual(encoding, resource[name])
+
+            for name in ('', 'a', 'name100', 'name5a', 'zzz', 'Name1'):
+                self.assertNotIn(name, resource)
+                self.assertIsNone(resource.get(name))
+
+    def test_compile_bel_resource(self):
+        """Test compiling a BEL resource file keeps its header."""
+        compile_bel_resource(TEST_ANNOTATION_PATH, self.path)
+
+        with CompiledResource(self.path) as resource:
+            self.assertEqual('TESTAN1', resource.header['AnnotationDefinition']['Keyword'])
+            self.assertEqual(get_bel_resource(TEST_ANNOTATION_PATH)['Values'], dict(resource))
+
+    def test_cli(self):
+        """Test the ``namespace compile`` command."""
+        result = CliRunner().invoke(main, ['namespace', 'compile', TEST_ANNOTATION_PATH, '-o', self.path])
+        self.assertEqual(0, result.exit_code, msg=result.output)
+
+        with CompiledResource(self.path) as resource:
+            self.assertEqual('O', resource['TestAnnot3'])
+
+    def test_block_size(self):
+        """Test that block sizes that can't be stored are rejected."""
+        for block_size in (0, -1, 0x10000):
+            with self.assertRaises(ValueError):
+                compile_values({'A': 'O'}, self.path, block_size=block_size)
+
+    def test_invalid(self):
+        """Test that other files can't be opened."""
+        with self.assertRaises(ValueError):
+            CompiledResource(TEST_ANNOTATION_PATH)
+
+    def test_truncated(self):
+        """Test that files shorter than their header, their tables, or their names can't be opened."""
+        compile_values({'name{}'.format(i): 'O' for i in range(100)}, self.path)
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        for length in (1, 30, len(data) - 300, len(data) - 1):
+            with open(self.path, 'wb') as file:
+                file.write(data[:length])
+            with self.assertRaises(ValueError):
+                CompiledResource(self.path)
+
+    def test_little_endian(self):
+        """Test that the tables are stored little-endian on every platform."""
+        compile_values({'A': 'O', 'B': 'P'}, self.path, block_size=1)
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        header = struct.Struct('<4sHHQQQ')
+        meta_length = header.unpack_from(data)[-2]
+        position = header.size + meta_length
+        position += -position % 8
+
+        self.assertEqual(
+            struct.pack('<QQHH', 0, 2, 0, 1),
+            data[position:position + 20],
+        )
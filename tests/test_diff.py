@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for finding the differences between two versions of a BEL resource."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from bel_resources import iter_bel_resources_diff, iter_values_diff, write_namespace
+from bel_resources.cli import main
+from bel_resources.diff import ValueChange
+
+OLD = {'AKT1': 'GRP', 'EGFR': 'GRP', 'MAPT': 'G', 'TP53': 'GRP'}
+NEW = {'AKT1': 'GRP', 'APP': 'GRP', 'MAPT': 'GRP', 'TP53': 'GRP', 'ZZZ': ''}
+
+EXPECTED = [
+    ValueChange('added', 'APP', None, 'GPR'),
+    ValueChange('removed', 'EGFR', 'GPR', None),
+    ValueChange('changed', 'MAPT', 'G', 'GPR'),
+    ValueChange('added', 'ZZZ', None, ''),
+]
+
+
+class TestDiff(unittest.TestCase):
+    """Tests for :func:`iter_bel_resources_diff`."""
+
+    def setUp(self):
+        """Write two versions of a namespace to a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.old_path = os.path.join(self.directory, 'old.belns')
+        self.new_path = os.path.join(self.directory, 'new.belns')
+        write_namespace(OLD, 'Test', 'TEST', file=self.old_path)
+        write_namespace(NEW, 'Test', 'TEST', file=self.new_path)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_values(self):
+        """Test the differences between two sorted iterables of values, with repeated names."""
+        old = [('a', '1'), ('b', '1'), ('b', '2'), ('c', '1')]
+        new = [('b', '2'), ('c', '1'), ('c', '3'), ('d', None)]
+        self.assertEqual(
+            [
+                ValueChange('removed', 'a', '1', None),
+                ValueChange('changed', 'c', '1', '3'),
+                ValueChange('added', 'd', None, None),
+            ],
+            list(iter_values_diff(old, new)),
+        )
+
+    def test_resources(self):
+        """Test the differences between two namespace files."""
+        self.assertEqual(EXPECTED, list(iter_bel_resources_diff(self.old_path, self.new_path)))
+        self.assertEqual([], list(iter_bel_resources_diff(self.new_path, self.new_path)))
+
+    def test_unsorted(self):
+        """Test that unsorted values raise an error unless they are sorted first."""
+        with open(self.new_path) as file:
+            lines = file.read().splitlines()
+        start = lines.index('[Values]') + 1
+        lines[start:] = reversed(lines[start:])
+        with open(self.new_path, 'w') as file:
+            print('\n'.join(lines), file=file)
+
+        with self.assertRaises(ValueError):
+            list(iter_bel_resources_diff(self.old_path, self.new_path))
+
+        self.assertEqual(EXPECTED, list(iter_bel_resources_diff(self.old_path, self.new_path, max_in_memory=2)))
+
+    def test_unsorted_repeated(self):
+        """Test that the last encoding of a repeated name is used when sorting, even without a delimiter."""
+        with open(self.new_path) as file:
+            lines = file.read().splitlines()
+        start = lines.index('[Values]') + 1
+        lines[start:] = ['MAPT|Z', 'APP', 'APP|GRP', 'MAPT'] + list(reversed(lines[start:]))
+        with open(self.new_path, 'w') as file:
+            print('\n'.join(lines), file=file)
+
+        for max_in_memory in (1, 2, 100):
+            changes = list(iter_bel_resources_diff(self.old_path, self.new_path, max_in_memory=max_in_memory))
+            self.assertEqual(EXPECTED, changes, msg='max in memory: {}'.format(max_in_memory))
+
+    def test_cli(self):
+        """Test the command line interface outputs JSON lines."""
+        result = CliRunner().invoke(main, ['namespace', 'diff', self.old_path, self.new_path])
+        self.assertEqual(0, result.exit_code, msg=result.output)
+        changes = [json.loads(line) for line in result.output.splitlines() if line.startswith('{')]
+        self.assertEqual([change._asdict() for change in EXPECTED], changes)
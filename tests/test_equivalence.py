@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the BELEQ equivalence index."""
+
+import os
+import tempfile
+import unittest
+import uuid
+
+from bel_resources import EquivalenceIndex
+
+UUIDS = [str(uuid.uuid4()) for _ in range(3)]
+
+
+def _write_beleq(path, keyword, values):
+    with open(path, 'w') as file:
+        print('[Namespace]', file=file)
+        print('Keyword={}'.format(keyword), file=file)
+        print('[Processing]', file=file)
+        print('DelimiterString=|', file=file)
+        print('[Values]', file=file)
+        for name, value in values:
+            print('{}|{}'.format(name, value), file=file)
+
+
+class TestEquivalenceIndex(unittest.TestCase):
+    """Tests for :py:class:`EquivalenceIndex`."""
+
+    def setUp(self):
+        """Write BELEQ files for two namespaces to a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.hgnc_path = os.path.join(self.directory, 'hgnc.beleq')
+        self.mgi_path = os.path.join(self.directory, 'mgi.beleq')
+        _write_beleq(self.hgnc_path, 'HGNC', [('AKT1', UUIDS[0]), ('EGFR', UUIDS[1]), ('MAPT', UUIDS[2])])
+        _write_beleq(self.mgi_path, 'MGI', [('Akt1', UUIDS[0]), ('Egfr', UUIDS[1]), ('Akt1b', UUIDS[0])])
+        self.index = EquivalenceIndex.from_resources([self.hgnc_path, self.mgi_path])
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_uuids(self):
+        """Test getting the UUIDs of names."""
+        self.assertEqual(['HGNC', 'MGI'], self.index.keywords)
+        self.assertEqual(3, len(self.index))
+        self.assertEqual(UUIDS[0], self.index.get_uuid('HGNC', 'AKT1'))
+        self.assertEqual(UUIDS[0], self.index.get_uuid('MGI', 'Akt1b'))
+        self.assertIsNone(self.index.get_uuid('HGNC', 'Akt1'))
+        with self.assertRaises(KeyError):
+            self.index.get_uuid('CHEBI', 'water')
+
+    def test_members(self):
+        """Test getting the names with the same UUID across namespaces."""
+        self.assertEqual(
+            [('HGNC', 'AKT1'), ('MGI', 'Akt1'), ('MGI', 'Akt1b')],
+            self.index.get_members(UUIDS[0]),
+        )
+        self.assertEqual([('HGNC', 'MAPT')], self.index.get_members(UUIDS[2]))
+        self.assertEqual([], self.index.get_members(str(uuid.uuid4())))
+
+    def test_translate(self):
+        """Test translating names between namespaces."""
+        self.assertEqual('Egfr', self.index.translate('HGNC', 'EGFR', 'MGI'))
+        self.assertEqual(
+            ['Akt1', None, None, 'Egfr'],
+            self.index.translate_many('HGNC', ['AKT1', 'MAPT', 'missing', 'EGFR'], 'MGI'),
+        )
+        self.assertEqual(['AKT1', 'AKT1'], self.index.translate_many('MGI', ['Akt1', 'Akt1b'], 'HGNC'))
+
+    def test_add(self):
+        """Test adding a namespace after the members were laid out."""
+        self.index.get_members(UUIDS[1])
+        self.index.add('RGD', {'Egfr': UUIDS[1]})
+        self.assertEqual([('HGNC', 'EGFR'), ('MGI', 'Egfr'), ('RGD', 'Egfr')], self.index.get_members(UUIDS[1]))
+
+        with self.assertRaises(ValueError):
+            self.index.add('RGD', {})
+        with self.assertRaises(ValueError):
+            self.index.add('BAD', {'a': 'not a uuid'})
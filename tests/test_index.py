@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for indexes over BEL resources."""
+
+import os
+import tempfile
+import unittest
+
+from bel_resources import FuzzyIndex, NamespaceIndex, PrefixIndex, get_bel_resource
+from tests.constants import TEST_ANNOTATION_PATH
+
+VALUES = {
+    'AKT1': 'GRP',
+    'Akt2': 'GRP',
+    'EGFR': None,
+}
+
+
+class TestNamespaceIndex(unittest.TestCase):
+    """Tests for :class:`NamespaceIndex`."""
+
+    def test_case_sensitive(self):
+        """Test lookups in a case-sensitive namespace."""
+        index = NamespaceIndex(VALUES)
+
+        self.assertIn('AKT1', index)
+        self.assertNotIn('akt1', index)
+        self.assertEqual('GRP', index['AKT1'])
+        self.assertIsNone(index['EGFR'])
+        self.assertEqual('X', index.get('akt1', 'X'))
+        self.assertEqual(
+            [('AKT1', 'GRP'), None, ('EGFR', None)],
+            index.lookup_many(['AKT1', 'AKT2', 'EGFR']),
+        )
+
+    def test_case_insensitive(self):
+        """Test lookups in a case-insensitive namespace."""
+        index = NamespaceIndex(VALUES, case_sensitive=False)
+
+        self.assertIn('akt1', index)
+        self.assertEqual('Akt2', index.normalize('AKT2'))
+        self.assertEqual('GRP', index['aKt2'])
+        self.assertEqual(
+            [('AKT1', 'GRP'), ('Akt2', 'GRP'), None],
+            index.lookup_many(['akt1', 'AKT2', 'AKT3']),
+        )
+        self.assertEqual(['AKT3', 'egf'], index.missing(name for name in ['akt1', 'AKT3', 'egfr', 'egf']))
+
+    def test_from_resource(self):
+        """Test building an index from a resource with ``CaseSensitiveFlag=no``."""
+        index = NamespaceIndex.from_resource(get_bel_resource(TEST_ANNOTATION_PATH))
+        self.assertFalse(index.case_sensitive)
+        self.assertEqual(5, len(index))
+        self.assertEqual('O', index['testannot1'])
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Tests for :class:`PrefixIndex`."""
+
+    names = ['AKT1', 'AKT2', 'AKT3', 'Akt1s1', 'EGFR', 'ERBB2']
+
+    def test_search(self):
+        """Test prefix queries in a case-sensitive index."""
+        index = PrefixIndex(self.names)
+        self.assertEqual(['AKT1', 'AKT2', 'AKT3'], index.search('AKT'))
+        self.assertEqual(['AKT1', 'AKT2'], index.search('AK', k=2))
+        self.assertEqual(['Akt1s1'], index.search('Akt'))
+        self.assertEqual([], index.search('akt'))
+        self.assertEqual([], index.search('ZZZ'))
+        self.assertEqual(self.names, index.search('', k=None))
+
+    def test_search_case_insensitive(self):
+        """Test prefix queries in a case-insensitive index return names as they're written."""
+        index = PrefixIndex(self.names, case_sensitive=False)
+        self.assertEqual(['AKT1', 'Akt1s1'], index.search('akt1'))
+        self.assertEqual(['EGFR', 'ERBB2'], index.search('e'))
+
+    def test_dump_load(self):
+        """Test that an index can be saved and loaded."""
+        index = PrefixIndex(self.names, case_sensitive=False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.pickle')
+            index.dump(path)
+            loaded = PrefixIndex.load(path)
+
+        self.assertEqual(len(index), len(loaded))
+        self.assertEqual(index.search('akt'), loaded.search('akt'))
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Tests for :class:`FuzzyIndex`."""
+
+    names = ['AKT1', 'AKT2', 'AKT3', 'EGFR', 'ERBB2', 'MAPK1', 'MAPK3']
+
+    def test_suggest(self):
+        """Test suggesting the closest names."""
+        index = FuzzyIndex(self.names)
+        self.assertEqual([('AKT1', 0)], index.suggest('AKT1', k=1))
+        self.assertEqual([('EGFR', 1)], index.suggest('EGFRR', max_distance=1))
+        self.assertEqual({'MAPK1', 'MAPK3'}, {name for name, _ in index.suggest('MAPK', max_distance=1)})
+        self.assertEqual([], index.suggest('XYZ', max_distance=1))
+
+    def test_suggest_case_insensitive(self):
+        """Test suggestions are given as they're written."""
+        index = FuzzyIndex(self.names, case_sensitive=False)
+        self.assertEqual([[('EGFR', 0)], [('ERBB2', 1)]], index.suggest_many(['egfr', 'erb2'], k=1))
+
+    def test_max_postings(self):
+        """Test that only the rarest n-grams are read when the budget of postings is small."""
+        index = FuzzyIndex(['A{}'.format(i) for i in range(1000)])
+        self.assertEqual(10, len(index.suggest('A1', k=10, max_postings=None)))
+        self.assertEqual([('A1', 0)], index.suggest('A1', k=10, max_postings=5))
+        self.assertEqual([('A999', 0)], index.suggest('A999', k=1, max_postings=5))
+        self.assertEqual(5, len(index.suggest('A', k=10, max_postings=5)))
+
+    def test_dump_load(self):
+        """Test that an index can be saved and loaded."""
+        index = FuzzyIndex(self.names, case_sensitive=False)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.pickle')
+            index.dump(path)
+            loaded = FuzzyIndex.load(path)
+
+        self.assertEqual(index.suggest('akt'), loaded.suggest('akt'))
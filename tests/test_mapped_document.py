@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the memory-mapped BEL Script reader."""
+
+import os
+import re
+import tempfile
+import unittest
+
+from bel_resources import MappedBELScript, UnfinishedLineError, split_file_to_annotations_and_definitions
+from bel_resources.read_document import sanitize_file_lines
+from tests.examples import simple
+from tests.test_bel_resources import TestSanitizeLinesParallel
+
+
+class TestMappedBELScript(unittest.TestCase):
+    """Tests for :py:class:`MappedBELScript`."""
+
+    def setUp(self):
+        """Make a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def _write(self, lines, name='test.bel'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            for line in lines:
+                print(line, file=file)
+        return path
+
+    def test_lines(self):
+        """Test that the logical lines and their line numbers are the same as sanitizing."""
+        lines = TestSanitizeLinesParallel.lines + ['  p(HGNC:A) -> p(HGNC:B)  ', '\tp(HGNC:C) -> p(HGNC:D)']
+        with MappedBELScript(self._write(lines)) as script:
+            expected = list(sanitize_file_lines(lines))
+            self.assertEqual(len(expected), len(script))
+            self.assertEqual(expected, list(script.iter_lines()))
+            self.assertEqual([line for _, line in expected], list(script))
+            self.assertTrue(any(script.is_multiline(index) for index in range(len(script))))
+
+    def test_unicode_whitespace(self):
+        """Test that lines are stripped of non-ASCII whitespace like sanitizing."""
+        lines = [
+            '\xa0',
+            'p(HGNC:A) -> p(HGNC:B)\xa0',
+            '\u3000p(HGNC:Ä) -> p(HGNC:C)',
+            'SET Evidence = "Something \\\xa0',
+            'or other"',
+        ]
+        with MappedBELScript(self._write(lines)) as script:
+            self.assertEqual(list(sanitize_file_lines(lines)), list(script.iter_lines()))
+            self.assertEqual(b'p(HGNC:\xc3\x84) -> p(HGNC:C)', bytes(script.get_bytes(1)))
+
+    def test_split(self):
+        """Test that the parts are the same as splitting the lines."""
+        lines = simple.splitlines()
+        with MappedBELScript(self._write(lines)) as script:
+            parts = script.split()
+            for expected, indexes in zip(split_file_to_annotations_and_definitions(lines), parts):
+                self.assertEqual(list(expected), list(script.iter_lines(indexes)))
+            self.assertEqual(14, len(parts[2]))
+
+    def test_split_without_metadata(self):
+        """Test that the line ending the metadata goes with the definitions, like when splitting the lines."""
+        lines = ['p(HGNC:A) -> p(HGNC:B)', 'p(HGNC:C) -> p(HGNC:D)']
+        with MappedBELScript(self._write(lines)) as script:
+            self.assertEqual((range(0, 0), range(0, 1), range(1, 2)), script.split())
+
+    def test_bytes(self):
+        """Test getting the bytes of a line and matching without decoding."""
+        with MappedBELScript(self._write(simple.splitlines())) as script:
+            _, _, statements = script.split()
+            view = script.get_bytes(statements[0])
+            self.assertEqual(script[statements[0]].encode('utf-8'), bytes(view))
+            view.release()
+
+            indexes = list(script.match(re.compile(b'SET Citation'), statements))
+            self.assertLess(0, len(indexes))
+            self.assertTrue(all(script[index].startswith('SET Citation') for index in indexes))
+
+    def test_empty(self):
+        """Test mapping an empty file."""
+        with MappedBELScript(self._write([])) as script:
+            self.assertEqual(0, len(script))
+            self.assertEqual((range(0, 0), range(0, 0), range(0, 0)), script.split())
+
+    def test_unfinished(self):
+        """Test that an unfinished line at the end raises an error."""
+        with self.assertRaises(UnfinishedLineError):
+            MappedBELScript(self._write(['SET Evidence = "Something', 'or other']))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for merging BEL namespace files."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from bel_resources import get_bel_resource, iter_merged_values, merge_namespaces, write_namespace
+
+
+class TestMerge(unittest.TestCase):
+    """Tests for :func:`merge_namespaces`."""
+
+    def setUp(self):
+        """Write namespaces to a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for index, values in enumerate([
+            {'AKT1': 'GRP', 'EGFR': 'G'},
+            {'APP': 'GRP', 'EGFR': 'R', 'TP53': 'GRP'},
+            {'EGFR': 'GP', 'ZZZ': ''},
+        ]):
+            path = os.path.join(self.directory, 'test{}.belns'.format(index))
+            write_namespace(values, 'Test {}'.format(index), 'TEST{}'.format(index), file=path)
+            self.paths.append(path)
+
+        self.output_path = os.path.join(self.directory, 'merged.belns')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_iter_merged_values(self):
+        """Test merging sorted iterables of values."""
+        self.assertEqual(
+            [('a', 'AB'), ('b', ''), ('c', 'C')],
+            list(iter_merged_values([
+                [('a', 'B'), ('b', None)],
+                [('a', 'BA'), ('c', 'C')],
+                [],
+            ])),
+        )
+
+    def test_merge(self):
+        """Test merging namespace files."""
+        merge_namespaces(self.paths, 'Merged', 'MERGED', namespace_version='1', file=self.output_path)
+
+        result = get_bel_resource(self.output_path)
+        self.assertEqual('MERGED', result['Namespace']['Keyword'])
+        self.assertEqual('1', result['Namespace']['VersionString'])
+        self.assertEqual(
+            {'AKT1': 'GPR', 'APP': 'GPR', 'EGFR': 'GPR', 'TP53': 'GPR', 'ZZZ': ''},
+            result['Values'],
+        )
+
+    def test_unsorted(self):
+        """Test that unsorted values raise an error unless they are sorted first."""
+        with open(self.paths[1]) as file:
+            lines = file.read().splitlines()
+        start = lines.index('[Values]') + 1
+        lines[start:] = ['EGFR', 'EGFR|O'] + list(reversed(lines[start:]))
+        with open(self.paths[1], 'w') as file:
+            print('\n'.join(lines), file=file)
+
+        with self.assertRaises(ValueError):
+            merge_namespaces(self.paths, 'Merged', 'MERGED', file=self.output_path)
+
+        for max_in_memory in (1, 100):
+            merge_namespaces(self.paths, 'Merged', 'MERGED', max_in_memory=max_in_memory, file=self.output_path)
+            values = get_bel_resource(self.output_path)['Values']
+            self.assertEqual(5, len(values))
+            self.assertEqual('GOPR', values['EGFR'])
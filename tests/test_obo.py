@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting OBO files to BEL resources."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from bel_resources import get_bel_resource
+from bel_resources.obo import (
+    convert_obo_to_bel_resources, convert_obo_to_belanno, convert_obo_to_belns, iter_obo_terms,
+)
+
+OBO = """format-version: 1.2
+data-version: releases/2019-01-01
+ontology: test
+! a comment line
+
+[Term]
+id: TEST:0001
+name: first term ! with a comment
+def: "The first term." [PMID:1]
+is_a: TEST:0000
+
+[Term]
+id: TEST:0002
+name: second term {source="curated"}
+relationship: part_of TEST:0001
+
+[Term]
+id: TEST:0003
+name: obsolete term
+is_obsolete: true
+
+[Term]
+id: OTHER:0001
+name: other term
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+
+class TestOBO(unittest.TestCase):
+    """Tests for the streaming OBO reader and converters."""
+
+    def setUp(self):
+        """Write an OBO file to a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.obo_path = os.path.join(self.directory, 'test.obo')
+        with open(self.obo_path, 'w') as file:
+            file.write(OBO)
+        self.output_path = os.path.join(self.directory, 'test.bel')
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.directory)
+
+    def test_iter_obo_terms(self):
+        """Test reading the header and terms, skipping obsolete terms and other stanzas."""
+        header, terms = iter_obo_terms(OBO.splitlines())
+        self.assertEqual('test', header['ontology'])
+        self.assertEqual('releases/2019-01-01', header['data-version'])
+        self.assertEqual(
+            [
+                {'id': 'TEST:0001', 'name': 'first term'},
+                {'id': 'TEST:0002', 'name': 'second term'},
+                {'id': 'OTHER:0001', 'name': 'other term'},
+            ],
+            list(terms),
+        )
+
+    def test_iter_obo_terms_all_tags(self):
+        """Test keeping all tags."""
+        _, terms = iter_obo_terms(OBO.splitlines(), tags=None)
+        term = next(terms)
+        self.assertEqual(['TEST:0000'], term['is_a'])
+        self.assertEqual('"The first term." [PMID:1]', term['def'])
+
+    def test_belns(self):
+        """Test converting to a namespace of identifiers or names."""
+        convert_obo_to_belns(self.obo_path, self.output_path, encoding='O')
+        result = get_bel_resource(self.output_path)
+        self.assertEqual('test', result['Namespace']['Keyword'])
+        self.assertEqual('releases/2019-01-01', result['Namespace']['VersionString'])
+        self.assertEqual({'TEST:0001': 'O', 'TEST:0002': 'O'}, result['Values'])
+
+        convert_obo_to_belns(self.obo_path, self.output_path, use_names=True)
+        self.assertEqual({'first term': '', 'second term': ''}, get_bel_resource(self.output_path)['Values'])
+
+    def test_belanno(self):
+        """Test converting to an annotation."""
+        convert_obo_to_belanno(self.obo_path, self.output_path)
+        result = get_bel_resource(self.output_path)
+        self.assertEqual('test', result['AnnotationDefinition']['Keyword'])
+        self.assertEqual({'first term': '', 'second term': ''}, result['Values'])
+
+    def test_bel_resources(self):
+        """Test converting to several resources in one pass gives the same files as converting to each."""
+        paths = [os.path.join(self.directory, name) for name in ('names.belns', 'ids.belns', 'test.belanno')]
+        convert_obo_to_bel_resources(
+            self.obo_path,
+            names_path=paths[0],
+            identifiers_path=paths[1],
+            annotation_path=paths[2],
+            encoding='O',
+            process_identifiers=str.lower,
+        )
+        self.assertEqual({'first term': 'O', 'second term': 'O'}, get_bel_resource(paths[0])['Values'])
+        self.assertEqual({'test:0001': 'O', 'test:0002': 'O'}, get_bel_resource(paths[1])['Values'])
+
+        convert_obo_to_belanno(self.obo_path, self.output_path)
+        self.assertEqual(get_bel_resource(self.output_path)['Values'], get_bel_resource(paths[2])['Values'])
+
+    def test_bel_resources_some(self):
+        """Test that only the given outputs are written."""
+        names_path = os.path.join(self.directory, 'names.belns')
+        convert_obo_to_bel_resources(self.obo_path, names_path=names_path)
+        self.assertEqual(['names.belns', 'test.obo'], sorted(os.listdir(self.directory)))
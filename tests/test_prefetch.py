@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for getting the resources defined in a BEL Script in the background."""
+
+import unittest
+
+from bel_resources import (
+    EmptyResourceError, ResourcePrefetcher, get_definition_urls, split_file_lazily,
+)
+from bel_resources.constants import ANNOTATION_URL_FMT, NAMESPACE_URL_FMT
+from tests.constants import TEST_ANNOTATION_PATH, TEST_NAMESPACE_EMPTY_PATH
+from tests.examples import simple
+
+
+class TestPrefetch(unittest.TestCase):
+    """Tests for :py:class:`ResourcePrefetcher`."""
+
+    def test_get_definition_urls(self):
+        """Test getting the URLs of the namespaces and annotations defined in a document."""
+        _, definitions, _ = split_file_lazily(simple.splitlines())
+        namespaces, annotations = get_definition_urls(definitions)
+        self.assertEqual({'CHEBI', 'HGNC'}, set(namespaces))
+        self.assertTrue(namespaces['HGNC'].endswith('hgnc-human-genes.belns'))
+        self.assertIn('Species', annotations)
+        self.assertTrue(annotations['Species'].endswith('species-taxonomy-id.belanno'))
+
+    def test_prefetch(self):
+        """Test getting the resources defined in a document while reading its statements."""
+        lines = [
+            'SET DOCUMENT Name = "Test"',
+            NAMESPACE_URL_FMT.format('EMPTY', TEST_NAMESPACE_EMPTY_PATH),
+            ANNOTATION_URL_FMT.format('Test', TEST_ANNOTATION_PATH),
+            'DEFINE ANNOTATION TestList AS LIST {"a", "b"}',
+            'SET TestList = "a"',
+            'p(HGNC:A) -> p(HGNC:B)',
+        ]
+        _, definitions, statements = split_file_lazily(lines)
+
+        with ResourcePrefetcher(definitions, max_workers=2) as prefetcher:
+            self.assertEqual({'EMPTY': TEST_NAMESPACE_EMPTY_PATH}, prefetcher.namespaces)
+            self.assertEqual({'Test': TEST_ANNOTATION_PATH}, prefetcher.annotations)
+            self.assertEqual(2, sum(1 for _ in statements))
+
+            annotation = prefetcher.get_annotation('Test')
+            self.assertEqual(5, len(annotation['Values']))
+            self.assertIs(annotation, prefetcher.get_bel_resource(TEST_ANNOTATION_PATH))
+
+            with self.assertRaises(EmptyResourceError):
+                prefetcher.get_namespace('EMPTY')
+
+            with self.assertRaises(KeyError):
+                prefetcher.get_annotation('TestList')